@@ -1,8 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
 import platformdirs
 
-__cache_dir = platformdirs.user_cache_dir
+from . import __short_name__
+from .config import config
+from .types import QueryType
+
+__cache_dir = platformdirs.user_cache_dir(__short_name__.lower())
 __cache_db = f"{__cache_dir}/cache.sqlite"
+_key_clause = 'source_name = ? AND query_type = ? AND query = ? AND in_recursion = ?'
+
+
+def get_cache_dir() -> str:
+    return __cache_dir
+
+
+def get_cache_path() -> str:
+    return __cache_db
+
 
 class Cache:
-    def __init__(self) -> None:
-        self.cache_db_path = __cache_db
+    """Persistent cache of runner results
+
+    Results are keyed by source name, query type, normalized query, and whether the
+        search was made in recursion (as runners may skip branched-in queries), and
+        expire after the configured TTL. When the number of entries exceeds the
+        configured maximum, the least recently accessed entries are evicted.
+
+    Empty results are not cached, as many runners return an empty DataFrame on
+        transient failure (rate limits, proxy unavailability, and similar).
+
+    Attributes:
+        cache_db_path (str): Path to the SQLite database
+        enabled (bool): Whether the cache is read from and written to
+        refresh (bool): Skip reads, but still write fresh results to the cache
+        ttl (int): Seconds for which a cached result remains valid
+        max_entries (int): Maximum number of cached results to retain
+    """
+    def __init__(
+            self,
+            cache_db_path:str|None=None,
+            enabled:bool|None=None,
+            refresh:bool=False,
+            ttl:int|None=None,
+            max_entries:int|None=None,
+        ) -> None:
+        self.cache_db_path:str = cache_db_path if cache_db_path is not None else get_cache_path()
+        self.enabled:bool = enabled if enabled is not None else config['Cache']['enabled'] == 'True'
+        self.refresh:bool = refresh
+        self.ttl:int = ttl if ttl is not None else int(config['Cache']['ttl'])
+        self.max_entries:int = max_entries if max_entries is not None else int(config['Cache']['max_entries'])
+        self.__connection:sqlite3.Connection|None = None
+        self.__lock:threading.Lock = threading.Lock()
+
+
+    def __del__(self) -> None:
+        self.close()
+
+
+    def __connect(self) -> sqlite3.Connection:
+        """Lazily open the database, creating it if necessary. Caller must hold the lock."""
+        if self.__connection is None:
+            os.makedirs(os.path.dirname(self.cache_db_path) or '.', exist_ok=True)
+            self.__connection = sqlite3.connect(self.cache_db_path, check_same_thread=False)
+            columns = [row[1] for row in self.__connection.execute('PRAGMA table_info(results)')]
+            if columns and 'in_recursion' not in columns:
+                self.__connection.execute('DROP TABLE results') # Written by an older version; safe to discard
+            self.__connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    source_name TEXT NOT NULL,
+                    query_type TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    in_recursion INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (source_name, query_type, query, in_recursion)
+                )
+                """
+            )
+            self.__connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            self.__connection.execute('DELETE FROM results WHERE created < ?', (time.time() - self.ttl,))
+            self.__connection.commit()
+        return self.__connection
+
+
+    @staticmethod
+    def normalize_query(query:str) -> str:
+        """Normalize a query so that trivially different queries share a cache entry"""
+        return ' '.join(str(query).split()).lower()
+
+
+    def get(self, source_name:str, query_type:QueryType, query:str, in_recursion:bool=False) -> pd.DataFrame|None:
+        """Get cached results for a given source and query
+
+        Returns:
+            pd.DataFrame|None -- The cached results, or None if not cached or expired
+        """
+        if not self.enabled or self.refresh:
+            return None
+
+        key = (source_name, query_type.value, self.normalize_query(query), int(in_recursion))
+
+        with self.__lock:
+            connection = self.__connect()
+            row = connection.execute(
+                f'SELECT created, data FROM results WHERE {_key_clause}',
+                key,
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            now = time.time()
+            if row[0] < now - self.ttl:
+                connection.execute(f'DELETE FROM results WHERE {_key_clause}', key)
+                connection.commit()
+                return None
+
+            connection.execute(
+                f'UPDATE results SET accessed = ? WHERE {_key_clause}',
+                (now, *key),
+            )
+            connection.commit()
+
+        return pd.DataFrame(json.loads(row[1]))
+
+
+    def set(
+            self,
+            source_name:str,
+            query_type:QueryType,
+            query:str,
+            data:pd.DataFrame,
+            in_recursion:bool=False,
+        ) -> None:
+        """Cache the results of a given source and query, evicting old entries if necessary"""
+        if not self.enabled or data is None or data.empty:
+            return
+
+        try:
+            serialized_data:str = data.to_json(orient='records')
+        except (TypeError, ValueError, OverflowError):
+            return # Not all runner output is guaranteed to be serializable; better to skip than fail the search
+
+        now = time.time()
+        with self.__lock:
+            connection = self.__connect()
+            connection.execute(
+                'INSERT OR REPLACE INTO results (source_name, query_type, query, in_recursion, created, accessed, data) VALUES (?, ?, ?, ?, ?, ?, ?)',  # noqa: E501
+                (
+                    source_name, query_type.value, self.normalize_query(query), int(in_recursion),
+                    now, now, serialized_data,
+                ),
+            )
+            self.__evict(connection)
+            connection.commit()
+
+
+    def __evict(self, connection:sqlite3.Connection) -> None:
+        """Evict the least recently accessed entries beyond max_entries. Caller must hold the lock."""
+        entries:int = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        if entries <= self.max_entries:
+            return
+        connection.execute(
+            'DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY accessed ASC LIMIT ?)',
+            (entries - self.max_entries,),
+        )
+
+
+    def clear(self) -> None:
+        """Remove all cached results"""
+        with self.__lock:
+            connection = self.__connect()
+            connection.execute('DELETE FROM results')
+            connection.commit()
+
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
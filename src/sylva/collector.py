@@ -1,6 +1,28 @@
+import threading
+from typing import Any, Dict, List
+
 import pandas as pd
 
-from .types import ResultDataFrame
+from .types import ResultDataFrame, is_missing
+
+
+class _UniqueValues:
+    """Insertion-ordered set of values, able to return only those added since a given position"""
+    def __init__(self) -> None:
+        self.__values:List = []
+        self.__seen:set = set()
+    def __len__(self) -> int:
+        return len(self.__values)
+    def add(self, value:Any) -> None:
+        try:
+            if value in self.__seen:
+                return
+            self.__seen.add(value)
+        except TypeError:
+            return # Unhashable values can't be branched on regardless
+        self.__values.append(value)
+    def values(self, since:int=0) -> List:
+        return self.__values[since:]
 
 
 class Collector:
@@ -9,10 +31,19 @@ class Collector:
     This object should rarely be interacted with directly. Rather, developers
         are more likely to interact with this object via sylva.handler.Handler objects.
 
+    Duplicate rows are rejected as they are inserted, disregarding any columns given
+        by deduplication_ignored_columns, and are retained separately for retrieval
+        with get_data(include_duplicates=True), or by default once include_duplicates is set.
+
+    Unique values of each identifying column are indexed as rows are inserted, so
+        retrieving unique (and branchable) values never requires a scan of the results.
+
     Methods:
         insert: Insert a new ResultDataFrame into the collector
         get_data: Returns a DataFrame of the collected results
         deduplicate: Deduplicate the collected results
+        checkpoint: Returns a marker of the current position of each branchable index
+        get_new_branchables: Returns the branchable values added since a given checkpoint
         get_unique_queries: Returns a list of unique queries
         get_unique_usernames: Returns a list of unique usernames
         get_unique_emails: Returns a list of unique emails
@@ -20,53 +51,105 @@ class Collector:
         get_unique_fullnames: Returns a list of unique full names
         get_unique_fullname_groups: Returns a list of unique firstname, middlename, and lastname groups
     """
-    def __init__(self) -> None:
-        self.__data:ResultDataFrame = ResultDataFrame()
+    _indexed_columns:tuple[str, ...] = ('query', 'username', 'email', 'phone', 'full_name')
+    _fullname_groups:str = 'fullname_groups'
+
+    def __init__(self, deduplication_ignored_columns:List[str]|None=None) -> None:
+        self.__data:ResultDataFrame = ResultDataFrame(ignored_columns=deduplication_ignored_columns)
+        self.include_duplicates:bool = False
+        # Runners may insert concurrently when dispatched by the handler's thread pool
+        self.__lock:threading.RLock = threading.RLock()
+        self.__unique:Dict[str, _UniqueValues] = {
+            column: _UniqueValues() for column in (*self._indexed_columns, self._fullname_groups)
+        }
+        self.__unique_branchable:Dict[str, _UniqueValues] = {
+            column: _UniqueValues() for column in (*self._indexed_columns, self._fullname_groups)
+        }
 
 
     def insert(self, new_data:ResultDataFrame|pd.DataFrame) -> None:
         if isinstance(new_data, ResultDataFrame):
             new_data = new_data.get_data()
-        self.__data.insert_frame(new_data)
+        with self.__lock:
+            self.__index_rows(self.__data.insert_frame(new_data))
+
+
+    def __index_rows(self, rows:List[Dict]) -> None:
+        """Add the identifying values of newly inserted rows to the unique indexes. Caller must hold the lock."""
+        for row in rows:
+            indexes = [self.__unique]
+            if row.get('branch_recommended') == True: # noqa: E712 # may be a numpy bool
+                indexes.append(self.__unique_branchable)
+
+            for column in self._indexed_columns:
+                value = row.get(column)
+                if is_missing(value):
+                    continue
+                for index in indexes:
+                    index[column].add(value)
 
+            first_name, middle_name, last_name = row.get('first_name'), row.get('middle_name'), row.get('last_name')
+            if not is_missing(first_name) and not is_missing(last_name):
+                group = (first_name, None if is_missing(middle_name) else middle_name, last_name)
+                for index in indexes:
+                    index[self._fullname_groups].add(group)
 
-    def get_data(self) -> pd.DataFrame:
-        return self.__data.get_data()
+
+    def get_data(self, include_duplicates:bool|None=None) -> pd.DataFrame:
+        if include_duplicates is None:
+            include_duplicates = self.include_duplicates
+        with self.__lock:
+            return self.__data.get_data(include_duplicates=include_duplicates)
 
 
     def deduplicate(self) -> pd.DataFrame:
-        return self.__data.deduplicate()
+        with self.__lock:
+            return self.__data.deduplicate()
+
+
+    def checkpoint(self) -> Dict[str, int]:
+        """Mark the current position of each branchable index
+
+        Returns:
+            Dict[str, int] -- A checkpoint to later pass to get_new_branchables
+        """
+        with self.__lock:
+            return {column: len(index) for column, index in self.__unique_branchable.items()}
+
+
+    def get_new_branchables(self, checkpoint:Dict[str, int]|None=None) -> Dict[str, List]:
+        """Get the branchable values discovered since a given checkpoint
+
+        Keyword Arguments:
+            checkpoint {Dict[str, int]} -- A checkpoint previously returned by checkpoint(),
+                or None for all branchable values (default: {None})
+
+        Returns:
+            Dict[str, List] -- New values keyed by column name, with firstname, middlename,
+                and lastname groups keyed as 'fullname_groups'
+        """
+        checkpoint = checkpoint or {}
+        with self.__lock:
+            return {
+                column: index.values(since=checkpoint.get(column, 0))
+                for column, index in self.__unique_branchable.items()
+            }
+
+
+    def __get_unique(self, column:str, branchable_only:bool) -> List:
+        with self.__lock:
+            return (self.__unique_branchable if branchable_only else self.__unique)[column].values()
 
 
     def get_unique_queries(self, branchable_only:bool=False) -> list[str]:
-        df = self.__data.get_data()
-        if branchable_only:
-            df = df[df['branch_recommended'] == True] # noqa: E712
-        return df['query'].dropna().unique().tolist()  # type: ignore[no-any-return]
+        return self.__get_unique('query', branchable_only)
     def get_unique_usernames(self, branchable_only:bool=False) -> list[str]:
-        df = self.__data.get_data()
-        if branchable_only:
-            df = df[df['branch_recommended'] == True] # noqa: E712
-        return df['username'].dropna().unique().tolist()  # type: ignore[no-any-return]
+        return self.__get_unique('username', branchable_only)
     def get_unique_emails(self, branchable_only:bool=False) -> list[str]:
-        df = self.__data.get_data()
-        if branchable_only:
-            df = df[df['branch_recommended'] == True] # noqa: E712
-        return df['email'].dropna().unique().tolist()  # type: ignore[no-any-return]
+        return self.__get_unique('email', branchable_only)
     def get_unique_phones(self, branchable_only:bool=False) -> list[str]:
-        df = self.__data.get_data()
-        if branchable_only:
-            df = df[df['branch_recommended'] == True] # noqa: E712
-        return df['phone'].dropna().unique().tolist()  # type: ignore[no-any-return]
+        return self.__get_unique('phone', branchable_only)
     def get_unique_fullnames(self, branchable_only:bool=False) -> list[str]:
-        df = self.__data.get_data()
-        if branchable_only:
-            df = df[df['branch_recommended'] == True] # noqa: E712
-        return df['full_name'].dropna().unique().tolist()  # type: ignore[no-any-return]
+        return self.__get_unique('full_name', branchable_only)
     def get_unique_fullname_groups(self, branchable_only:bool=False) -> set[tuple[str, str, str]]:
-        df = self.__data.get_data()
-        if branchable_only:
-            df = df[df['branch_recommended'] == True] # noqa: E712
-        filtered_df = df.dropna(subset=['first_name', 'last_name'])
-        filtered_data = set(zip(filtered_df['first_name'], filtered_df['middle_name'], filtered_df['last_name']))
-        return filtered_data
+        return set(self.__get_unique(self._fullname_groups, branchable_only))
@@ -60,10 +60,35 @@ def update_config() -> None:
         "log_level": check_option(section="General", key="log_level", default="3"),
         "colorful": check_option(section="General", key="colorful", default="True"),
         "flaresolverr": check_option(section="General", key="flaresolverr", default="True"),
+        "flaresolverr_lazy": check_option(section="General", key="flaresolverr_lazy", default="True"),
+        "flaresolverr_sessions": check_option(section="General", key="flaresolverr_sessions", default="2"),
     }
     config["Cache"] = {
         "enabled": check_option(section="Cache", key="enabled", default="True"),
         "ttl": check_option(section="Cache", key="ttl", default="86400"),
+        "max_entries": check_option(section="Cache", key="max_entries", default="10000"),
+    }
+    config["Concurrency"] = {
+        "enabled": check_option(section="Concurrency", key="enabled", default="True"),
+        "max_workers": check_option(section="Concurrency", key="max_workers", default="8"),
+        "max_branch_workers": check_option(section="Concurrency", key="max_branch_workers", default="4"),
+        "default_source_limit": check_option(section="Concurrency", key="default_source_limit", default="2"),
+        "source_limits": check_option(section="Concurrency", key="source_limits", default="reddit:1"),
+    }
+    config["HTTP"] = {
+        "timeout": check_option(section="HTTP", key="timeout", default="10"),
+        "retries": check_option(section="HTTP", key="retries", default="3"),
+        "backoff_factor": check_option(section="HTTP", key="backoff_factor", default="0.5"),
+        "pool_maxsize": check_option(section="HTTP", key="pool_maxsize", default="16"),
+        "rate_limit_max_wait": check_option(section="HTTP", key="rate_limit_max_wait", default="120"),
+    }
+    config["NLP"] = {
+        "model": check_option(section="NLP", key="model", default="md"),
+        "batch_size": check_option(section="NLP", key="batch_size", default="64"),
+        "n_process": check_option(section="NLP", key="n_process", default="1"),
+    }
+    config["Results"] = {
+        "deduplication_ignored_columns": check_option(section="Results", key="deduplication_ignored_columns"),
     }
     config["Keys"] = {
         "endato-name": check_option(section="Keys", key="endato-name"),
@@ -82,6 +107,7 @@ def update_config() -> None:
         "proxynova-branch-out": check_option(section="Target Options", key="proxynova-branch-out", default="True"),
         "endato-limit-queries": check_option(section="Target Options", key="endato-limit-queries", default="True"),
         "endato-branch-in": check_option(section="Target Options", key="endato-branch-in", default="True"),
+        "sherlock-sites": check_option(section="Target Options", key="sherlock-sites"),
     }
     with open(__config_path, "w") as configfile:
         config.write(configfile)
@@ -22,17 +22,19 @@ def search_subcommand(args:argparse.Namespace) -> None:
 
     Keyword Arguments:
     args -- argparse.Namespace"""
-    handler = Handler()
+    handler = Handler(use_cache=False if args.no_cache else None, refresh_cache=args.refresh_cache)
     handler.search_all(args.query)
     print()
     print(handler.collector.get_data())
+    handler.close()
 
 
 def branch_subcommand(args:argparse.Namespace) -> None:
-    handler = Handler()
-    handler.branch_all(args.query, depth=args.branch_depth)
+    handler = Handler(use_cache=False if args.no_cache else None, refresh_cache=args.refresh_cache)
+    handler.branch_all(args.query, depth=args.branch_depth, no_deduplicate=args.no_deduplicate)
     print()
     print(handler.collector.get_data())
+    handler.close()
 
 
 def interactive_setup_subcommand(args:argparse.Namespace) -> None:
@@ -46,6 +48,8 @@ def interactive() -> None:
     parser_search = subparsers.add_parser('search', help='Find an identity')
     parser_search.add_argument('query', help='The query to search for')
     parser_search.add_argument('--captcha', dest='custom-captcha-proxy-address', action='store', default=None, metavar='PROXY_URL', help='Use an alternative captcha-solving proxy server')  # fmt: skip # noqa: E501
+    parser_search.add_argument('--no-cache', dest='no_cache', action='store_true', default=False, help='Neither read nor write cached results')  # fmt: skip # noqa: E501
+    parser_search.add_argument('--refresh', dest='refresh_cache', action='store_true', default=False, help='Ignore cached results, caching fresh results in their place')  # fmt: skip # noqa: E501
     parser_search.set_defaults(func=search_subcommand)
 
     parser_branch = subparsers.add_parser('branch', help='Recursively search based on discovered identities')
@@ -53,6 +57,8 @@ def interactive() -> None:
     parser_branch.add_argument('-d', '--depth', type=int, default=3, dest='branch_depth', metavar='123', help='The depth to search')  # fmt: skip # noqa: E501
     parser_branch.add_argument('-a', '--show-all', dest='no_deduplicate', action='store_true', default=False, help='Do not deduplicate results')  # fmt: skip # noqa: E501
     parser_branch.add_argument('--captcha', dest='custom-captcha-proxy-address', action='store', default=None, metavar='PROXY_URL', help='Use an alternative captcha-solving proxy server')  # fmt: skip # noqa: E501
+    parser_branch.add_argument('--no-cache', dest='no_cache', action='store_true', default=False, help='Neither read nor write cached results')  # fmt: skip # noqa: E501
+    parser_branch.add_argument('--refresh', dest='refresh_cache', action='store_true', default=False, help='Ignore cached results, caching fresh results in their place')  # fmt: skip # noqa: E501
     parser_branch.set_defaults(func=branch_subcommand)
 
     parser_interactive = subparsers.add_parser('interactive', help='Launch the query builder (mutliple parameters allowed)')  # fmt: skip # noqa: E501
@@ -0,0 +1 @@
+__version__ = '0.1.dev1+gc5a6bf3.d20261018'
\ No newline at end of file
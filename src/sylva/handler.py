@@ -1,13 +1,19 @@
 import os
-from typing import List, NamedTuple
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple
 
 import phonenumbers
+import requests
 from colorama import Fore, Style
 
 from . import Collector
+from .cache import Cache
 from .config import config
 from .easy_logger import LogLevel, NoColor, loglevel, overwrite_previous_line
 from .errors import APIKeyError, RequestError
+from .helpers.http_client import HttpClient
 from .helpers.proxy import ProxySvc
 from .integrations import (
     endato,
@@ -45,7 +51,12 @@ class Handler:
 
     Attributes:
         collector (Collector): Collector object to store results
+        cache (Cache): Persistent cache of runner results
+        http (HttpClient): HTTP client shared by all runners, so connections are pooled between them
         runners (List[Runner]): List of search modules to execute queries
+        concurrent (bool): Whether runners are dispatched concurrently
+        max_workers (int): Maximum number of runners executed at once, across all queries
+        max_branch_workers (int): Maximum number of discovered queries searched at once
 
     Example: Executing a simple string-based search
         ```python
@@ -54,6 +65,7 @@ class Handler:
         handler = Handler()
         handler.branch_all('username')
         results = handler.collector.get_data() # Returns a DataFrame
+        handler.close()
 
         print(results)
         ```
@@ -72,31 +84,111 @@ class Handler:
         print(results)
         ```
     """
-    def __init__(self) -> None:
-        self.collector:Collector = Collector()
+    def __init__(self, concurrent:bool|None=None, use_cache:bool|None=None, refresh_cache:bool=False) -> None:
+        """
+        Args:
+            concurrent (bool, optional): Dispatch runners concurrently. Defaults to the
+                value of `[Concurrency] enabled` in the config.
+            use_cache (bool, optional): Read and write cached runner results. Defaults to
+                the value of `[Cache] enabled` in the config.
+            refresh_cache (bool, optional): Ignore cached results, but still cache fresh
+                results. Defaults to False.
+        """
+        ignored_columns:str = config['Results']['deduplication_ignored_columns']
+        self.collector:Collector = Collector(
+            deduplication_ignored_columns=[column.strip() for column in ignored_columns.split(',') if column.strip()],
+        )
+        self.cache:Cache = Cache(enabled=use_cache, refresh=refresh_cache)
         self.__default_country:str = 'US'
         self.__in_recursion = False
+        if concurrent is None:
+            concurrent = config['Concurrency']['enabled'] == 'True'
+        self.concurrent:bool = concurrent
+        self.max_workers:int = max(1, int(config['Concurrency']['max_workers']))
+        self.__output_lock:threading.Lock = threading.Lock()
+        self.http:HttpClient = HttpClient()
+        self.__proxy_svc:ProxySvc = ProxySvc()
         self.runners:List = [
             #proxynova.ProxyNova(collector=self.collector),
-            endato.Endato(collector=self.collector, api_name=config['Keys']['endato-name'], api_key=config['Keys']['endato-key'], country=self.__default_country),  # fmt: skip # noqa: E501
+            endato.Endato(collector=self.collector, api_name=config['Keys']['endato-name'], api_key=config['Keys']['endato-key'], country=self.__default_country, http=self.http),  # fmt: skip # noqa: E501
             #intelx.IntelX(collector=self.collector, api_key=config['Keys']['intelx-key']),
-            pgp_module.PGPModule(collector=self.collector),
-            veriphone.Veriphone(collector=self.collector, api_key=config['Keys']['veriphone-key'], country=self.__default_country),  # fmt: skip # noqa: E501
-            sherlock.Sherlock(collector=self.collector),
-            github.GitHub(collector=self.collector, api_key=config['Keys']['github-key']),
-            reddit.Reddit(collector=self.collector),
-            voter.Voter(collector=self.collector),
+            pgp_module.PGPModule(collector=self.collector, http=self.http),
+            veriphone.Veriphone(collector=self.collector, api_key=config['Keys']['veriphone-key'], country=self.__default_country, http=self.http),  # fmt: skip # noqa: E501
+            sherlock.Sherlock(collector=self.collector, http=self.http),
+            github.GitHub(collector=self.collector, api_key=config['Keys']['github-key'], http=self.http),
+            reddit.Reddit(collector=self.collector, http=self.http),
+            voter.Voter(collector=self.collector, http=self.http, proxy=self.__proxy_svc),
         ]
 
-        self.__proxy_svc:ProxySvc = ProxySvc()
-        if config['General']['flaresolverr'] == 'True' and os.environ.get('SYLVA_FLARESOLVERR', '') != 'False':
-            self.__prepare_flaresolverr()
+        self.max_branch_workers:int = max(1, int(config['Concurrency']['max_branch_workers']))
+        self.__global_slots:threading.BoundedSemaphore = threading.BoundedSemaphore(self.max_workers)
+        self.__source_slots:Dict[str, threading.BoundedSemaphore] = {}
+        self.__source_slots_lock:threading.Lock = threading.Lock()
+
+        self.__proxy_enabled:bool = (
+            config['General']['flaresolverr'] == 'True' and os.environ.get('SYLVA_FLARESOLVERR', '') != 'False'
+        )
+        self.__proxy_prepared:bool = False
+        self.__proxy_lock:threading.Lock = threading.Lock()
+        if config['General']['flaresolverr_lazy'] != 'True':
+            self.__ensure_flaresolverr()
 
 
     def __del__(self) -> None:
         del self.__proxy_svc
 
 
+    def close(self) -> None:
+        """Release the resources held by the runners, the proxy service, the HTTP client, and the cache
+
+        Runners holding their own connections or event loops (such as GitHub) are closed
+            explicitly, rather than left for interpreter shutdown.
+        """
+        for runner in self.runners:
+            if hasattr(runner, 'close'):
+                runner.close()
+        self.__proxy_svc.stop()
+        self.http.close()
+        self.cache.close()
+
+
+    @staticmethod
+    def __source_limit(source_name:str) -> int:
+        """Get the maximum number of concurrent executions permitted for a given source
+
+        Limits are read from `[Concurrency] source_limits` as comma-separated `name:limit`
+            pairs (matched case-insensitively against the source name), falling back to
+            `[Concurrency] default_source_limit`.
+        """
+        for source_limit in config['Concurrency']['source_limits'].split(','):
+            name, _, limit = source_limit.rpartition(':')
+            if name.strip().lower() == source_name.lower():
+                return max(1, int(limit))
+        return max(1, int(config['Concurrency']['default_source_limit']))
+
+
+    def __source_slot(self, source_name:str) -> threading.BoundedSemaphore:
+        """Get (creating if necessary) the semaphore bounding concurrency for a given source"""
+        with self.__source_slots_lock:
+            if source_name not in self.__source_slots:
+                self.__source_slots[source_name] = threading.BoundedSemaphore(self.__source_limit(source_name))
+            return self.__source_slots[source_name]
+
+
+    def __ensure_flaresolverr(self) -> None:
+        """Prepare the proxy service on first need, at most once per handler
+
+        Unless `[General] flaresolverr_lazy` is disabled, this is deferred until a runner
+            that requires the proxy accepts a query, so that searches which never reach
+            such a runner don't pay for browser startup.
+        """
+        with self.__proxy_lock:
+            if self.__proxy_prepared or not self.__proxy_enabled:
+                return
+            self.__proxy_prepared = True
+            self.__prepare_flaresolverr()
+
+
     def __prepare_flaresolverr(self) -> None:
         """Attempt to start the proxy service and a common browser session"""
         try:
@@ -130,17 +222,125 @@ class Handler:
                     print(f'{Fore.LIGHTCYAN_EX}{Style.BRIGHT}[*]{Style.RESET_ALL}{Fore.RESET} Browser session started')
 
 
-    def search_all(self, query:str|QueryDataItem, no_deduplicate:bool=False) -> int:
+    def __run_runner(self, runner, search_args:SearchArgs, overwrite_status:bool=True) -> int:  # type: ignore[no-untyped-def]
+        """Execute a single runner and report on its results
+
+        Args:
+            runner (Runner): The search module to execute
+            search_args (SearchArgs): The arguments to pass to the runner
+            overwrite_status (bool, optional): Overwrite the preceding status line
+                with the result. Should be disabled when runners execute concurrently,
+                as the previous line may belong to a different runner. Defaults to True.
+
+        Returns:
+            int: The number of identities discovered
+        """
+        def _overwrite() -> None:
+            if overwrite_status:
+                overwrite_previous_line()
+
+        # Runners may modify their arguments (e.g. refining the query type), so the key is taken beforehand.
+        # Recursion is part of the key, as runners may skip branched-in queries that they'd otherwise search.
+        cache_source:str = runner.source_name
+        cache_query_type:QueryType = search_args.query_type
+        cache_query:str = search_args.query
+        cache_in_recursion:bool = search_args.in_recursion
+        try:
+            cached_data = self.cache.get(
+                source_name=cache_source,
+                query_type=cache_query_type,
+                query=cache_query,
+                in_recursion=cache_in_recursion,
+            )
+        except sqlite3.Error:
+            cached_data = None # An unusable cache shouldn't fail the search
+
+        try:
+            if cached_data is not None:
+                self.collector.insert(cached_data)
+                results = len(cached_data.index)
+            else:
+                # Source slot is taken first so that waiting on a busy source doesn't hold a global slot
+                with self.__source_slot(runner.source_name), self.__global_slots:
+                    # Each runner should return a DataFrame, but since that data is already
+                    # added to the collector, all we care about is the number of new rows.
+                    new_data = runner.search(search_args=search_args)
+                results = len(new_data.index)
+                try:
+                    self.cache.set(
+                        source_name=cache_source,
+                        query_type=cache_query_type,
+                        query=cache_query,
+                        data=new_data,
+                        in_recursion=cache_in_recursion,
+                    )
+                except sqlite3.Error:
+                    pass
+
+        except RequestError as e:
+            with self.__output_lock:
+                if loglevel <= LogLevel.DEBUG.value:
+                    _overwrite()
+
+                if loglevel >= LogLevel.INFO.value:
+                    if e.rate_limit_exceeded:
+                        print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Rate limit exceeded with {runner.source_name}')  # fmt: skip # noqa: E501
+                    else:
+                        print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Something unexpected happened with {runner.source_name}')  # fmt: skip # noqa: E501
+
+                if loglevel >= LogLevel.DEBUG.value:
+                    print(e)
+
+        except requests.exceptions.RequestException as e:
+            with self.__output_lock:
+                if loglevel <= LogLevel.DEBUG.value:
+                    _overwrite()
+                if loglevel >= LogLevel.INFO.value:
+                    print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Unable to reach {runner.source_name}')  # fmt: skip # noqa: E501
+                if loglevel >= LogLevel.DEBUG.value:
+                    print(e)
+
+        except APIKeyError as e:
+            with self.__output_lock:
+                if loglevel <= LogLevel.DEBUG.value:
+                    _overwrite()
+                if e.key_not_provided:
+                    if loglevel >= LogLevel.INFO.value:
+                        print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} API key has not been provided for {runner.source_name} - {runner.source_obtain_keys_url}')  # fmt: skip # noqa: E501
+
+        else:
+            with self.__output_lock:
+                if loglevel < LogLevel.DEBUG.value:
+                    _overwrite()
+                cached_str:str = f' {Style.DIM}(cached){Style.RESET_ALL}' if cached_data is not None else ''
+                if loglevel >= LogLevel.SUCCESS_ONLY.value and results > 0:
+                    print(f'{Fore.LIGHTGREEN_EX}{Style.BRIGHT}[+]{Style.RESET_ALL}{Fore.RESET} Found {results} via {runner.source_name}{cached_str}')  # fmt: skip # noqa: E501
+                elif loglevel >= LogLevel.INFO.value and results == 0:
+                    print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} No results found via {runner.source_name}')  # fmt: skip # noqa: E501
+
+            return results
+
+        return 0
+
+
+    def search_all(self, query:str|QueryDataItem, no_deduplicate:bool=False, overwrite_status:bool=True) -> int:
         """Search all available modules for the given query
 
         Runs a single-depth search for a given query across all available modules and
             integrations, automatically deduplicating the results. Results are added to
             the object's collector.
 
+        When concurrency is enabled, all accepting runners are dispatched at once and
+            results are reported as each runner completes.
+
         Args:
             query (str|QueryDataItem): The query to search for
-            no_deduplicate (bool, optional): Skip deduplication for manual processing.
-                Defaults to False.
+            no_deduplicate (bool, optional): Include duplicate results in the collector's
+                data for manual processing. Results are deduplicated as they are collected,
+                so this sets `collector.include_duplicates`. Defaults to False.
+            overwrite_status (bool, optional): Overwrite the preceding status line with
+                each runner's result. Should be disabled when searches execute concurrently,
+                as the previous line may belong to a different search. Defaults to True.
 
         Returns:
             int: The number of identities discovered
@@ -152,16 +352,13 @@ class Handler:
             query_type = QueryType.TEXT
 
         total_discovered: int = 0
+        accepted: List[tuple] = []
 
         for runner in self.runners:
             search_args: SearchArgs = SearchArgs(
                     query=query,
                     in_recursion=self.__in_recursion,
                     query_type=query_type,
-                    proxy_data={
-                        'proxy_url': self.__proxy_svc.primary_proxy_url,  # type: ignore[dict-item]
-                        'flaresolverr_session_id': self.__proxy_svc.primary_session_id,  # type: ignore[dict-item]
-                    },
                 )
 
             if not runner.accepts(search_args=search_args):
@@ -169,49 +366,66 @@ class Handler:
                     print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Query type not supported by {runner.source_name}')  # fmt: skip # noqa: E501
                 continue
 
+            accepted.append((runner, search_args))
+
+        if any(getattr(runner, 'requires_proxy', False) for runner, _ in accepted):
+            self.__ensure_flaresolverr()
+
+        for _, search_args in accepted:
+            search_args.proxy_data = {
+                'proxy_url': self.__proxy_svc.primary_proxy_url,  # type: ignore[dict-item]
+                'flaresolverr_session_id': self.__proxy_svc.primary_session_id,  # type: ignore[dict-item]
+            }
+
+        if self.concurrent and len(accepted) > 1:
             if loglevel >= LogLevel.SUCCESS_ONLY.value:
-                print(f'{Fore.LIGHTCYAN_EX}{Style.BRIGHT}[*]{Style.RESET_ALL}{Fore.RESET} Searching {runner.source_name}...')  # fmt: skip # noqa: E501
+                print(f'{Fore.LIGHTCYAN_EX}{Style.BRIGHT}[*]{Style.RESET_ALL}{Fore.RESET} Searching {", ".join(runner.source_name for runner, _ in accepted)}...')  # fmt: skip # noqa: E501
 
-            try:
-                # Each runner should return a DataFrame, but since that data is already
-                # added to the collector, all we care about is the number of new rows.
-                results = len(
-                    runner.search(search_args=search_args).index
-                    )
+            with ThreadPoolExecutor(max_workers=min(len(accepted), self.max_workers)) as executor:
+                futures = [
+                    executor.submit(self.__run_runner, runner, search_args, False)
+                    for runner, search_args in accepted
+                ]
+                for future in as_completed(futures):
+                    total_discovered += future.result()
 
-                if loglevel < LogLevel.DEBUG.value:
-                    overwrite_previous_line()
-                if loglevel >= LogLevel.SUCCESS_ONLY.value and results > 0:
-                    print(f'{Fore.LIGHTGREEN_EX}{Style.BRIGHT}[+]{Style.RESET_ALL}{Fore.RESET} Found {results} via {runner.source_name}')  # fmt: skip # noqa: E501
-                elif loglevel >= LogLevel.INFO.value and results == 0:
-                    print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} No results found via {runner.source_name}')  # fmt: skip # noqa: E501
+        else:
+            for runner, search_args in accepted:
+                if loglevel >= LogLevel.SUCCESS_ONLY.value:
+                    print(f'{Fore.LIGHTCYAN_EX}{Style.BRIGHT}[*]{Style.RESET_ALL}{Fore.RESET} Searching {runner.source_name}...')  # fmt: skip # noqa: E501
 
-                total_discovered += results
+                total_discovered += self.__run_runner(runner, search_args, overwrite_status)
 
-            except RequestError as e:
-                if loglevel <= LogLevel.DEBUG.value:
-                    overwrite_previous_line()
+        self.collector.include_duplicates = no_deduplicate
+        return total_discovered
 
-                if loglevel >= LogLevel.INFO.value:
-                    if e.rate_limit_exceeded:
-                        print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Rate limit exceeded with {runner.source_name}')  # fmt: skip # noqa: E501
-                    else:
-                        print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Something unexpected happened with {runner.source_name}')  # fmt: skip # noqa: E501
+    def __branch_query(self, new_query:QueryDataItem, depth_index:int, overwrite_status:bool=True) -> int:
+        """Search a single query discovered while branching
 
-                if loglevel >= LogLevel.DEBUG.value:
-                    print(e)
+        Args:
+            new_query (QueryDataItem): The discovered query to search for
+            depth_index (int): The zero-indexed depth at which the query was discovered
+            overwrite_status (bool, optional): Overwrite the branch line if nothing was
+                found, and runner status lines with their results. Should be disabled when
+                queries execute concurrently. Defaults to True.
 
-            except APIKeyError as e:
-                if loglevel <= LogLevel.DEBUG.value:
-                    overwrite_previous_line()
-                if e.key_not_provided:
-                    if loglevel >= LogLevel.INFO.value:
-                        print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} API key has not been provided for {runner.source_name} - {runner.source_obtain_keys_url}')  # fmt: skip # noqa: E501
+        Returns:
+            int: The number of identities discovered
+        """
+        if loglevel >= LogLevel.SUCCESS_ONLY.value:
+            depth_str:str = ''
+            if loglevel >= LogLevel.INFO.value:
+                depth_str = f' {depth_index+1}' # Only show depth if verbosity above SUCCESS_ONLY
+            with self.__output_lock:
+                print(f'{Fore.BLUE}{Style.BRIGHT}[Branch{depth_str}]{Fore.RESET}{Style.RESET_ALL} {new_query.query} {Style.DIM} -  {new_query.type.value.lower()}{Style.RESET_ALL}')  # fmt: skip # noqa: E501
 
-        if not no_deduplicate:
-            self.collector.deduplicate()
+        discovered:int = self.search_all(query=new_query, overwrite_status=overwrite_status)
+        if not discovered and overwrite_status:
+            with self.__output_lock:
+                overwrite_previous_line()
+
+        return discovered
 
-        return total_discovered
 
     def branch_all(self, query: str, depth: int = 1, no_deduplicate: bool = False) -> int:
         """Recursively search all available modules for the given query
@@ -220,11 +434,15 @@ class Handler:
             integrations, automatically deduplicating the results. Results are added to
             the object's collector.
 
+        When concurrency is enabled, the queries discovered at each depth are dispatched
+            concurrently, bounded by `[Concurrency] max_branch_workers`.
+
         Args:
             query (str): The query to search for
             depth (int, optional): The depth to search. Defaults to 1.
-            no_deduplicate (bool, optional): Skip deduplication for manual processing.
-                Defaults to False.
+            no_deduplicate (bool, optional): Include duplicate results in the collector's
+                data for manual processing. Results are deduplicated as they are collected,
+                so this sets `collector.include_duplicates`. Defaults to False.
         """
         # TODO Any way to pretty this up? Avoid re-running queries against all on raw input
         queries_made: set = set((QueryDataItem(query=query, type=QueryType.TEXT),))
@@ -244,30 +462,39 @@ class Handler:
 
         self.__in_recursion = True # Passed to runners so they can self-skip if branch-in disabled
 
+        checkpoint:Dict[str, int] = {} # Empty checkpoint retrieves all branchables discovered so far
+
         for i in range(depth):
+            # Only values discovered since the previous depth can form new queries
+            branchables = self.collector.get_new_branchables(checkpoint)
+            checkpoint = self.collector.checkpoint()
+
             new_queries: set = set()
 
-            new_queries.update(QueryDataItem(query=query, type=QueryType.USERNAME) for query in self.collector.get_unique_usernames(branchable_only=True))  # fmt: skip # noqa: E501
-            new_queries.update(QueryDataItem(query=query, type=QueryType.EMAIL) for query in self.collector.get_unique_emails(branchable_only=True))  # fmt: skip # noqa: E501
-            new_queries.update(QueryDataItem(query=query, type=QueryType.PHONE) for query in self.collector.get_unique_phones(branchable_only=True))  # fmt: skip # noqa: E501
-            new_queries.update(QueryDataItem(query=query, type=QueryType.FULLNAME) for query in self.collector.get_unique_fullnames(branchable_only=True))  # fmt: skip # noqa: E501
-            new_queries.update(QueryDataItem(query=query, type=QueryType.FIRSTNAME_LASTNAME) for query in self.collector.get_unique_fullname_groups(branchable_only=True))  # type: ignore[arg-type] # fmt: skip # noqa: E501 # FIXME: Search needs to accept tuples
+            new_queries.update(QueryDataItem(query=query, type=QueryType.USERNAME) for query in branchables['username'])  # fmt: skip # noqa: E501
+            new_queries.update(QueryDataItem(query=query, type=QueryType.EMAIL) for query in branchables['email'])  # fmt: skip # noqa: E501
+            new_queries.update(QueryDataItem(query=query, type=QueryType.PHONE) for query in branchables['phone'])  # fmt: skip # noqa: E501
+            new_queries.update(QueryDataItem(query=query, type=QueryType.FULLNAME) for query in branchables['full_name'])  # fmt: skip # noqa: E501
+            new_queries.update(QueryDataItem(query=query, type=QueryType.FIRSTNAME_LASTNAME) for query in branchables['fullname_groups'])  # fmt: skip # noqa: E501 # FIXME: Search needs to accept tuples
 
             new_queries -= queries_made
             queries_made.update(new_queries)
 
-            for new_query in new_queries:
-                if loglevel >= LogLevel.SUCCESS_ONLY.value:
-                    depth_str:str = ''
-                    if loglevel >= LogLevel.INFO.value:
-                        depth_str = f' {i+1}' # Only show depth if verbosity above SUCCESS_ONLY
-                    print(f'{Fore.BLUE}{Style.BRIGHT}[Branch{depth_str}]{Fore.RESET}{Style.RESET_ALL} {new_query.query} {Style.DIM} -  {new_query.type.value.lower()}{Style.RESET_ALL}')  # fmt: skip # noqa: E501
-                if not self.search_all(query=new_query):
-                    overwrite_previous_line()
-
-            if not no_deduplicate:
-                self.collector.deduplicate()
+            if self.concurrent and len(new_queries) > 1:
+                # The frontier is already deduplicated against queries_made above, so workers
+                # never share a query
+                with ThreadPoolExecutor(max_workers=min(len(new_queries), self.max_branch_workers)) as executor:
+                    futures = [
+                        executor.submit(self.__branch_query, new_query, i, False)
+                        for new_query in new_queries
+                    ]
+                    for future in as_completed(futures):
+                        future.result()
+            else:
+                for new_query in new_queries:
+                    self.__branch_query(new_query, i)
 
         self.__proxy_svc.stop()
 
+        self.collector.include_duplicates = no_deduplicate
         return 0 # FIXME Needs total discovered
@@ -3,20 +3,20 @@ import os
 from typing import Dict
 from urllib.parse import urlparse, urlunparse
 
-import requests
 from tldextract import extract as tldx
 
 from sylva import __github_maintainer_url__
+from sylva.helpers.http_client import HttpClient
 
 ref_list: Dict[str, str] = {
     'ref_a': '14fc468bc4ac40a22ae70106b351d1ce',
 }
 
 # fmt: off
-def compare_to_known(query: str, id: str) -> bool:
+def compare_to_known(query: str, id: str, http: HttpClient|None = None) -> bool:
     if os.environ.get('SYLVA_COMPARATOR', 'True') == 'False':
         return False
-    if hashlib.sha256(query.replace(' ', '').lower().encode('utf-8')).hexdigest() in requests.get(url=f"{urlunparse(urlparse(__github_maintainer_url__)._replace(netloc=f'gist.{tldx(__github_maintainer_url__).domain}.{tldx(__github_maintainer_url__).suffix}'))}/{id}/raw").text:  # noqa: E501
+    if hashlib.sha256(query.replace(' ', '').lower().encode('utf-8')).hexdigest() in (http if http is not None else HttpClient()).get(url=f"{urlunparse(urlparse(__github_maintainer_url__)._replace(netloc=f'gist.{tldx(__github_maintainer_url__).domain}.{tldx(__github_maintainer_url__).suffix}'))}/{id}/raw").text:  # noqa: E501
         return True
     return False
 # fmt: on
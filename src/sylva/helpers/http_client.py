@@ -0,0 +1,79 @@
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .. import __user_agent__
+from ..config import config
+
+
+class HttpClient:
+    """Shared HTTP client for runners and helpers
+
+    Wraps a single requests.Session so that connections to the same host are kept
+        alive and reused, rather than each call paying for a new TCP and TLS handshake.
+        Requests carry a default timeout and the Sylva User-Agent, and idempotent requests
+        are retried with backoff on transient gateway errors.
+
+    Headers and timeouts given to individual requests take precedence over the defaults.
+
+    Attributes:
+        session (requests.Session): The underlying pooled session
+        timeout (float): Default timeout for each request, in seconds
+    """
+    _retry_status_codes:tuple[int, ...] = (502, 503, 504)
+
+    def __init__(
+            self,
+            timeout:float|None=None,
+            retries:int|None=None,
+            backoff_factor:float|None=None,
+            pool_maxsize:int|None=None,
+        ) -> None:
+        """Initialize the HTTP client
+
+        Keyword Arguments:
+            timeout {float} -- Default timeout for each request, in seconds (default: {[HTTP] timeout})
+            retries {int} -- Retries for idempotent requests on gateway errors (default: {[HTTP] retries})
+            backoff_factor {float} -- Exponential backoff factor between retries (default: {[HTTP] backoff_factor})
+            pool_maxsize {int} -- Connections kept alive per host (default: {[HTTP] pool_maxsize})
+        """
+        self.timeout:float = timeout if timeout is not None else float(config['HTTP']['timeout'])
+        if retries is None:
+            retries = int(config['HTTP']['retries'])
+        if backoff_factor is None:
+            backoff_factor = float(config['HTTP']['backoff_factor'])
+        if pool_maxsize is None:
+            pool_maxsize = int(config['HTTP']['pool_maxsize'])
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self._retry_status_codes,
+            raise_on_status=False, # Runners inspect the final status code themselves
+        )
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session:requests.Session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = __user_agent__
+
+
+    def request(self, method:str, url:str, **kwargs:Any) -> requests.Response:
+        """Send a request through the shared session, applying the default timeout if none is given"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method=method, url=url, **kwargs)
+
+
+    def get(self, url:str, **kwargs:Any) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+
+    def post(self, url:str, **kwargs:Any) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+
+    def close(self) -> None:
+        self.session.close()
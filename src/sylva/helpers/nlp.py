@@ -1,13 +1,23 @@
 import os
+import re
+import threading
+from typing import TYPE_CHECKING, Iterable
 
-import spacy
-from spacy.matcher import Matcher
+from ..config import config
+
+if TYPE_CHECKING: # spaCy alone takes over a second to import, so is imported only when a model is loaded
+    from spacy.language import Language
+    from spacy.matcher import Matcher
+    from spacy.tokens import Doc
 
 PRINT_TOKENS_FOR_DEBUG: bool = False
 
 LANGUAGE_RESOURCES: dict = {
     'en': {
-        'model': 'en_core_web_md',
+        'models': {
+            'md': 'en_core_web_md',
+            'sm': 'en_core_web_sm', # Smaller and faster to load, at the cost of some accuracy
+        },
         'patterns': [
             [
                 {"POS": "PRON", "LOWER": {"IN": ["i", "me", "my", "mine", "myself"]}},
@@ -20,23 +30,141 @@ LANGUAGE_RESOURCES: dict = {
                 {"ENT_TYPE": "GPE", "OP": "+"},
             ]
         ],
+        # Surface forms of the pronouns and residency lemmas above. A message containing none
+        # of either can't match, so needn't be parsed. Must be kept in sync with the patterns.
+        'prefilter': {
+            # spaCy splits apostrophe-less contractions (Im, Ive, Id, Ill) into "i" and a suffix
+            'pronouns': ['i', 'me', 'my', 'mine', 'myself', 'im', 'ive', 'id', 'ill'],
+            'residency_forms': [
+                'live', 'lives', 'lived', 'living',
+                'reside', 'resides', 'resided', 'residing',
+                'move', 'moves', 'moved', 'moving',
+                'hail', 'hails', 'hailed', 'hailing',
+                'grow', 'grows', 'grew', 'grown', 'growing',
+                'bear', 'bears', 'bore', 'born', 'borne', 'bearing',
+                'relocate', 'relocates', 'relocated', 'relocating',
+                'base', 'bases', 'based', 'basing',
+                'shift', 'shifts', 'shifted', 'shifting',
+            ],
+        },
     }
 }
 
+
+_spacy_model_base_path: str = os.path.join(os.path.dirname(__file__), '../data/nlp/spacy_models')
+_pipelines: dict[str, 'Language'] = {}
+_pipelines_lock: threading.Lock = threading.Lock()
+
+
+def get_model_name(language_code: str = 'en') -> str:
+    """Get the name of the spaCy model to use for a given language
+
+    The model size is read from the SYLVA_NLP_MODEL environment variable, falling back
+        to `[NLP] model` in the config.
+
+    Keyword Arguments:
+        language_code {str} -- The language to get the model for (default: {'en'})
+
+    Returns:
+        str -- The name of the model
+    """
+    model_size = os.environ.get('SYLVA_NLP_MODEL', config['NLP']['model'])
+    models: dict[str, str] = LANGUAGE_RESOURCES[language_code]['models']
+    if model_size not in models:
+        raise ValueError(f'Unknown NLP model size {model_size}, expected one of {", ".join(models)}')
+    return models[model_size]
+
+
+def load_pipeline(model_name: str) -> 'Language':
+    """Load a spaCy model, once per process
+
+    Loaded models are shared by every NatLangProcessor in the process. Loading before
+        worker processes are forked lets the workers share the parent's copy.
+
+    Keyword Arguments:
+        model_name {str} -- The name of the bundled model to load
+
+    Returns:
+        Language -- The loaded pipeline
+    """
+    with _pipelines_lock:
+        if model_name not in _pipelines:
+            import spacy
+            _pipelines[model_name] = spacy.load(os.path.join(_spacy_model_base_path, model_name))
+        return _pipelines[model_name]
+
+
+def _compile_word_list(words: list[str]) -> re.Pattern:
+    return re.compile(r'\b(?:' + '|'.join(re.escape(word) for word in words) + r')\b', re.IGNORECASE)
+
 class NatLangProcessor:
-    """Basic natural language processor for Sylva data collection"""
-    def __init__(self) -> None:
-        current_file_path = os.path.dirname(__file__)
-        spacy_model_base_path = os.path.join(current_file_path, '../data/nlp/spacy_models')
+    """Basic natural language processor for Sylva data collection
 
+    The spaCy model is loaded on first use rather than on construction, so that searches
+        which never process natural language don't pay for it.
+    """
+    def __init__(self, model_name: str|None = None) -> None:
+        """Initialize the natural language processor
+
+        Keyword Arguments:
+            model_name {str} -- The name of the bundled spaCy model to use (default: {get_model_name()})
+        """
         if os.environ.get('LANG', 'en') == 'en' or True: # TODO Add additional language support
             language_code = 'en'
 
-        self.nlp = spacy.load(f'{spacy_model_base_path}/{LANGUAGE_RESOURCES[language_code]["model"]}')
-        self.matcher: Matcher = Matcher(self.nlp.vocab)
+        self.language_code: str = language_code
+        self.model_name: str = model_name if model_name is not None else get_model_name(language_code)
+        self.__nlp: 'Language|None' = None
+        self.__matcher: 'Matcher|None' = None
+        self.__load_lock: threading.Lock = threading.Lock()
+
+        prefilter = LANGUAGE_RESOURCES[language_code]['prefilter']
+        self.__prefilter_pronouns: re.Pattern = _compile_word_list(prefilter['pronouns'])
+        self.__prefilter_residency_forms: re.Pattern = _compile_word_list(prefilter['residency_forms'])
+
+
+    def __load(self) -> None:
+        with self.__load_lock:
+            if self.__nlp is not None:
+                return
+            from spacy.matcher import Matcher
+
+            nlp = load_pipeline(self.model_name)
+            matcher = Matcher(nlp.vocab)
+            patterns = LANGUAGE_RESOURCES[self.language_code]['patterns']
+            matcher.add(f"RESIDENCY_PATTERN_{self.language_code.upper()}", patterns, greedy="LONGEST")
+            self.__matcher = matcher
+            self.__nlp = nlp
+
+
+    @property
+    def nlp(self) -> 'Language':
+        if self.__nlp is None:
+            self.__load()
+        return self.__nlp  # type: ignore[return-value]
 
-        patterns = LANGUAGE_RESOURCES[language_code]['patterns']
-        self.matcher.add(f"RESIDENCY_PATTERN_{language_code.upper()}", patterns, greedy="LONGEST")
+
+    @property
+    def matcher(self) -> 'Matcher':
+        if self.__matcher is None:
+            self.__load()
+        return self.__matcher  # type: ignore[return-value]
+
+
+    def might_mention_residence(self, message: str) -> bool:
+        """Cheaply determine whether a message could mention a residence, without parsing it
+
+        A message is only a candidate when it contains both a first person pronoun and a
+            form of a residency word, as the matcher requires both. False positives are
+            expected, and are weeded out by the parser; false negatives must not be.
+
+        Keyword Arguments:
+            message {str} -- The message to check
+
+        Returns:
+            bool -- False if the message certainly does not mention a residence
+        """
+        return bool(self.__prefilter_pronouns.search(message) and self.__prefilter_residency_forms.search(message))
 
 
     def get_residences(self, message: str) -> list[str]:
@@ -51,9 +179,58 @@ class NatLangProcessor:
         if not isinstance(message, str):
             raise TypeError('Message to parse must be a string')
 
+        if not self.might_mention_residence(message):
+            return []
+
+        return self.__extract_residences(self.nlp(message))
+
+
+    def get_residences_many(
+            self,
+            messages: Iterable[str],
+            batch_size: int|None = None,
+            n_process: int|None = None,
+        ) -> list[list[str]]:
+        """Get likely residences from each of a number of messages
+
+        Messages are processed in batches with nlp.pipe, which is considerably faster than
+            processing each message individually. Every component of the pipeline is needed,
+            as the matcher relies on tags, lemmas, and entities, and extraction on the parse.
+            Messages that can't mention a residence are never parsed at all.
+
+        Keyword Arguments:
+            messages {Iterable[str]} -- The messages to search for residences in
+            batch_size {int} -- Number of messages per batch (default: {[NLP] batch_size})
+            n_process {int} -- Number of processes to parse with (default: {[NLP] n_process})
+
+        Returns:
+            list[list[str]] -- A list of likely residences for each message, in the order given
+        """
+        messages = list(messages)
+        if not all(isinstance(message, str) for message in messages):
+            raise TypeError('Messages to parse must be strings')
+
+        if batch_size is None:
+            batch_size = int(config['NLP']['batch_size'])
+        if n_process is None:
+            n_process = int(config['NLP']['n_process'])
+
+        residences: list[list[str]] = [[] for _ in messages]
+        candidates: list[int] = [
+            index for index, message in enumerate(messages) if self.might_mention_residence(message)
+        ]
+
+        docs = self.nlp.pipe((messages[index] for index in candidates), batch_size=batch_size, n_process=n_process)
+        for index, doc in zip(candidates, docs):
+            residences[index] = self.__extract_residences(doc)
+
+        return residences
+
+
+    def __extract_residences(self, doc: 'Doc') -> list[str]:
+        """Extract likely residences from a processed document"""
         discovered_locations: list[str] = []
 
-        doc = self.nlp(message)
         matches = self.matcher(doc)
 
         assembled_location: str = ''
@@ -2,17 +2,89 @@ import calendar
 import json
 import pathlib
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from difflib import SequenceMatcher
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import unquote
 
 import pandas as pd
 import requests
 import tldextract
-from bs4 import BeautifulSoup
+from lxml import etree  # type: ignore[import-untyped]
 
 from .. import __url_normalization_pattern__
 from ..errors import RequestError
+from .http_client import HttpClient
+from .rate_limit import RateLimiter
+
+_url_normalization:re.Pattern = re.compile(__url_normalization_pattern__)
+
+
+def _compile(pattern:str, flags:int=0) -> re.Pattern|None:
+    """Compile a pattern, returning None rather than raising if it is invalid"""
+    try:
+        return re.compile(pattern, flags)
+    except re.error:
+        return None
+
+
+def _compile_domain(domain_data:Dict) -> Dict:
+    """Compile the patterns of a site_patterns.json domain entry, including those of its subdomains
+
+    Patterns that fail to compile are dropped, so that one bad entry does not break
+        matching for the remainder of the domain.
+
+    Keyword Arguments:
+        domain_data {Dict} -- The raw domain entry
+    Returns:
+        Dict -- A copy of the entry with each pattern replaced by its compiled form
+    """
+    compiled:Dict = dict(domain_data)
+
+    if 'self' in domain_data:
+        compiled['self'] = [
+            compiled_pattern for pattern in domain_data['self']
+            if (compiled_pattern := _compile(pattern, re.MULTILINE)) is not None
+        ]
+
+    if 'patterns' in domain_data:
+        compiled['patterns'] = []
+        for pattern in domain_data['patterns']:
+            compiled_entry:Dict = dict(pattern)
+            if 'sequence' in pattern:
+                compiled_entry['sequence'] = {step: _compile(step_pattern) for step, step_pattern in pattern['sequence'].items()}  # noqa: E501
+                if None in compiled_entry['sequence'].values():
+                    continue
+            else:
+                compiled_entry['pattern'] = _compile(pattern['pattern'])
+                if compiled_entry['pattern'] is None:
+                    continue
+            compiled['patterns'].append(compiled_entry)
+
+    if 'subdomains' in domain_data:
+        compiled['subdomains'] = {
+            subdomain: _compile_domain(data) for subdomain, data in domain_data['subdomains'].items()
+        }
+
+    return compiled
+
+
+def extract_links(body:str) -> List[str]:
+    """Extract the unique anchor hrefs from an HTML body in a single pass
+
+    Keyword Arguments:
+        body {str} -- The HTML body to scan
+    Returns:
+        List[str] -- The unique hrefs, in the order they first appear
+    """
+    # Parsed as bytes, as lxml refuses str input carrying an XML encoding declaration
+    document = etree.fromstring(body.encode('utf-8'), etree.HTMLParser(encoding='utf-8'))
+    if document is None: # Empty or whitespace-only body
+        return []
+    return list(dict.fromkeys(str(href) for href in document.xpath('//a/@href')))
 
 
 @dataclass
@@ -26,13 +98,34 @@ class PatternMatchQueryArgs:
 
 
 class PatternMatch:
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            http:HttpClient|None=None,
+            max_workers:int=8,
+            per_domain_limit:int=2,
+            per_domain_interval:float=0.5,
+        ) -> None:
+        """Initialize the pattern matcher
+
+        Keyword Arguments:
+            http {HttpClient} -- Shared HTTP client for follow-up fetches (default: {new client})
+            max_workers {int} -- Maximum concurrent fetches when batching with search_many (default: {8})
+            per_domain_limit {int} -- Maximum concurrent fetches against any one domain (default: {2})
+            per_domain_interval {float} -- Minimum seconds between fetches against any one domain (default: {0.5})
+        """
         self.__module_name:str = 'Discovered'
+        self.http:HttpClient = http if http is not None else HttpClient()
+        self.max_workers:int = max_workers
+        self.per_domain_limit:int = per_domain_limit
+        self.per_domain_interval:float = per_domain_interval
+        self.__domain_slots:Dict[str, Tuple[threading.BoundedSemaphore, RateLimiter]] = {}
+        self.__domain_slots_lock:threading.Lock = threading.Lock()
         self.local_pattern_data = f'{pathlib.Path(__file__).parent.resolve()}/../data/site_patterns.json'
         self.pattern_data = None
         with open(self.local_pattern_data, 'r') as f:
             self.pattern_data = json.load(f)
-        self.pattern_data = self.pattern_data['patterns']
+        # Patterns are compiled once here, as every claimed Sherlock site is matched against them
+        self.pattern_data = {domain: _compile_domain(data) for domain, data in self.pattern_data['patterns'].items()}
         self._generic_desirables:List[Dict] = [
             {'pattern': r'^(?P<url>https?:\/\/(?:www\.)?behance\.net\/(?P<uid>[^\/\s]+\/?))$', 'platform_name': 'Behance'},  # noqa: E501
             {'pattern': r'^(?P<url>https?:\/\/(?:www\.)?dribbble\.com\/(?P<uid>[^\/\s]+\/?))$', 'platform_name': 'Dribbble'},  # noqa: E501
@@ -55,9 +148,66 @@ class PatternMatch:
             {'pattern': r'^(?P<url>https?:\/\/(?:www\.)?stackoverflow\.com\/users\/[0-9]+?\/(?P<uid>[^\/\s]+\/?))$', 'platform_name': 'StackOverflow'},  # noqa: E501
             {'pattern': r'^(?P<url>https?:\/\/(?:www\.)?crowdin\.com\/profile\/(?P<uid>[^\/\s]+\/?))$', 'platform_name': 'Crowdin'},  # noqa: E501
         ]
-        self._known_redirects_by_query_string:List[str] = [
-            r'https?:\/\/(?:www\.)youtube\.com\/redirect\?.+?q=(?P<url>https?%3A%2F%2F.+)' # YouTube has problems..FIXME
+        self._known_redirects_by_query_string:List[re.Pattern] = [
+            re.compile(r'https?:\/\/(?:www\.)youtube\.com\/redirect\?.+?q=(?P<url>https?%3A%2F%2F.+)'), # YouTube has problems..FIXME # noqa: E501
         ]
+        for desired_target in self._generic_desirables:
+            desired_target['pattern'] = re.compile(desired_target['pattern'])
+            if 'validation_pattern' in desired_target:
+                desired_target['validation_pattern'] = re.compile(desired_target['validation_pattern'])
+
+
+    @contextmanager
+    def __domain_slot(self, url:str) -> Iterator[RateLimiter]:
+        """Bound the number of concurrent fetches against the domain of a given URL, and pace them
+
+        Yields:
+            RateLimiter -- The domain's rate limiter, to be updated with the response
+        """
+        split_url = tldextract.extract(url)
+        domain = f'{split_url.domain}.{split_url.suffix}'
+        with self.__domain_slots_lock:
+            if domain not in self.__domain_slots:
+                self.__domain_slots[domain] = (
+                    threading.BoundedSemaphore(self.per_domain_limit),
+                    RateLimiter(interval=self.per_domain_interval),
+                )
+            slot, rate_limiter = self.__domain_slots[domain]
+        with slot:
+            rate_limiter.acquire()
+            yield rate_limiter
+
+
+    def __get(self, url:str, headers:Dict[str, str]|None=None) -> requests.Response:
+        with self.__domain_slot(url) as rate_limiter:
+            response = self.http.get(url, headers=headers)
+            rate_limiter.update(response.status_code, response.headers)
+            return response
+
+
+    def search_many(self, args_list:List[PatternMatchQueryArgs]) -> List[pd.DataFrame]:
+        """Searches for patterns in each of the given URLs and bodies concurrently
+
+        Follow-up fetches share the HTTP client's connection pool and are bounded per domain.
+            Searches that fail, whether for lack of information or a failed fetch,
+            result in an empty DataFrame.
+
+        Keyword Arguments:
+            args_list {List[PatternMatchQueryArgs]} -- The arguments for each search
+        Returns:
+            List[pd.DataFrame] -- The results of each search, in the order given
+        """
+        def _search(args:PatternMatchQueryArgs) -> pd.DataFrame:
+            try:
+                return self.search(args)
+            except (RequestError, requests.exceptions.RequestException):
+                return pd.DataFrame()
+
+        if not args_list:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(len(args_list), self.max_workers)) as executor:
+            return list(executor.map(_search, args_list))
 
 
     def search(self, args:PatternMatchQueryArgs) -> pd.DataFrame:
@@ -75,7 +225,7 @@ class PatternMatch:
         recursion_depth = args.recursion_depth
 
 
-        url = re.sub(__url_normalization_pattern__, '', url)
+        url = _url_normalization.sub('', url)
 
 
         def _search_patterns(pattern:Dict) -> None:
@@ -83,15 +233,18 @@ class PatternMatch:
                 steps = len(pattern['sequence'])
                 last_match = body
                 for step in range(1, steps):
-                    last_match = re.search(pattern['sequence'][f'{step}'], body)['next']  # type: ignore[index, arg-type]
+                    step_captures = pattern['sequence'][f'{step}'].search(body)
+                    if step_captures is None:
+                        return
+                    last_match = step_captures['next']
                     if last_match is None or last_match == '':
                         return
                 else:
                     if last_match:
-                        captures = re.search(pattern['sequence'][f'{steps}'], last_match)
+                        captures = pattern['sequence'][f'{steps}'].search(last_match)
 
             else:
-                captures = re.search(pattern['pattern'], body)  # type: ignore[arg-type]
+                captures = pattern['pattern'].search(body)
 
             if captures:
                 new_item:Dict = {}
@@ -101,7 +254,7 @@ class PatternMatch:
                 if 'uid' in captures.groupdict():
                     new_item['username'] = captures.group('uid')
                 if 'url' in captures.groupdict():
-                    normalized_url = re.sub(__url_normalization_pattern__, '', captures.group('url'))
+                    normalized_url = _url_normalization.sub('', captures.group('url'))
                     new_item['platform_url'] = normalized_url
                 new_item['source_name'] = "Discovered"
                 new_data.append(new_item)
@@ -117,12 +270,15 @@ class PatternMatch:
             return False
 
 
-        def _search_desirables(url:str) -> Dict[str, str]:
+        def _search_desirables(url:str, desired_target:Dict) -> Dict[str, str]:
             # Normalize the URL by removing www, tailing slash, and query string
-            target_url = re.sub(__url_normalization_pattern__, '', a['href'])
+            target_url = _url_normalization.sub('', url)
 
             if 'validation_string' in desired_target or 'validation_pattern' in desired_target:
-                target_response = requests.get(target_url)
+                try:
+                    target_response = self.__get(target_url)
+                except (RequestError, requests.exceptions.RequestException):
+                    return {}
                 if target_response.status_code != 200:
                     return {}
                 target_body = target_response.text
@@ -131,7 +287,7 @@ class PatternMatch:
                 if desired_target['validation_string'] not in target_body:
                     return {}
             if 'validation_pattern' in desired_target:
-                if not re.match(desired_target['validation_pattern'], target_body):
+                if not desired_target['validation_pattern'].match(target_body):
                     return {}
 
             found_desirable: Dict[str, str] = {
@@ -140,15 +296,17 @@ class PatternMatch:
                 'source_name': "Discovered",
             }
 
-            captured_groups = re.search(desired_target['pattern'], target_url)
-            if 'uid' in captured_groups.groupdict() and captured_groups.group('uid') is not None:  # type: ignore[union-attr]
+            captured_groups = desired_target['pattern'].search(target_url)
+            if captured_groups is None:
+                return {}
+            if 'uid' in captured_groups.groupdict() and captured_groups.group('uid') is not None:
                 # Skip if username is too similar to the domain is was discovered on
                 # TODO Matching can likely be improved with some secondary library
-                similarity = SequenceMatcher(None, split_url.domain, captured_groups.group('uid')).ratio()  # type: ignore[union-attr]
+                similarity = SequenceMatcher(None, split_url.domain, captured_groups.group('uid')).ratio()
                 if similarity >= 0.75:
                     return {}
 
-                found_desirable['username'] = captured_groups.group('uid')  # type: ignore[union-attr]
+                found_desirable['username'] = captured_groups.group('uid')
 
             return found_desirable
 
@@ -177,7 +335,7 @@ class PatternMatch:
                     # Must iterate so as to not overwrite possibly pre-existing headers
                     headers[header] = value
 
-            response = requests.get(url=url, headers=headers)
+            response = self.__get(url=url, headers=headers)
             if response.status_code != 200:
                 return pd.DataFrame()
             body = response.text
@@ -198,7 +356,7 @@ class PatternMatch:
         if 'self' in current_pattern_data:
             self_scrape_data:Dict = {}
             for pattern in current_pattern_data['self']:
-                captures = re.search(pattern, body, re.MULTILINE)  # type: ignore[arg-type]
+                captures = pattern.search(body)
                 if captures:
                     self_scrape_data['platform_name'] = current_pattern_data['friendly_name']
                     self_scrape_data['platform_url'] = url
@@ -237,29 +395,38 @@ class PatternMatch:
             for pattern in current_pattern_data['patterns']:
                 _search_patterns(pattern)
 
-        soup = BeautifulSoup(body, 'html.parser')  # type: ignore[arg-type]
+        # The body is parsed once, and every pattern matched against the resulting links
+        links:List[str] = extract_links(body)  # type: ignore[arg-type]
 
         for desired_target in self._generic_desirables:
-            for a in soup.find_all('a', href=re.compile(desired_target['pattern'])):
+            for href in links:
+                if not desired_target['pattern'].search(href):
+                    continue
                 if (
                     'scrape_to_resolve' in desired_target
                     and desired_target['scrape_to_resolve']
                     and not recursion_depth
                 ):
                     search_args: PatternMatchQueryArgs = PatternMatchQueryArgs(
-                        url=a['href'],
+                        url=href,
                         recursion_depth=recursion_depth+1,
                     )
                     scraped_data:List[Dict] = self.search(args=search_args).to_dict(orient='records')
                     new_data.extend(scraped_data)
-                else:
-                    new_data.append(_search_desirables(url=a['href']))
+                elif found_desirable := _search_desirables(url=href, desired_target=desired_target):
+                    new_data.append(found_desirable)
 
         for known_redirect_pattern in self._known_redirects_by_query_string:
-            for a in soup.find_all('a', href=re.compile(known_redirect_pattern)):
-                matched_groups = re.search(known_redirect_pattern, a['href'])
-                if 'url' in matched_groups.groupdict():  # type: ignore[union-attr]
-                    print(f'Found redirect {matched_groups.group("url")}\n\n')  # type: ignore[union-attr]
-                    new_data.append(_search_desirables(url=matched_groups.group('url')))  # type: ignore[union-attr]
+            for href in links:
+                matched_groups = known_redirect_pattern.search(href)
+                if matched_groups is None:
+                    continue
+                if 'url' in matched_groups.groupdict():
+                    redirect_url = unquote(matched_groups.group('url'))
+                    for desired_target in self._generic_desirables:
+                        if not desired_target['pattern'].search(redirect_url):
+                            continue
+                        if found_desirable := _search_desirables(url=redirect_url, desired_target=desired_target):
+                            new_data.append(found_desirable)
 
         return pd.DataFrame(new_data)
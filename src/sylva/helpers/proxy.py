@@ -1,9 +1,15 @@
 import multiprocessing
 import os
+import socket
 import subprocess
 import sys
+import threading
 import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
 from multiprocessing.synchronize import Event as EventType
+from typing import Deque, Dict, Iterator
 from urllib.parse import urlparse, urlunparse
 
 import requests
@@ -12,6 +18,7 @@ from colorama import Back, Fore, Style
 from .. import __user_agent__
 from ..config import config
 from ..easy_logger import LogLevel, NoColor, loglevel
+from ..errors import RequestError
 from .flaresolverr.flaresolverr import run  # type: ignore[import-not-found, unused-ignore] # problematic during ci
 
 flaresolverr_base_headers:dict[str, str] = {
@@ -38,8 +45,8 @@ def test_if_flaresolverr_online(proxy_url:str) -> bool:
     proxy_url = urlunparse((parsed_url.scheme, parsed_url.netloc, '', '', '', ''))
 
     try:
-        flaresolverr_response_test = requests.get(url=proxy_url, headers=flaresolverr_base_headers)
-    except requests.exceptions.ConnectionError:
+        flaresolverr_response_test = requests.get(url=proxy_url, headers=flaresolverr_base_headers, timeout=5)
+    except requests.exceptions.RequestException:
         return False
 
     if flaresolverr_response_test.status_code != 200:
@@ -50,17 +57,66 @@ def test_if_flaresolverr_online(proxy_url:str) -> bool:
     return True
 
 
+def _find_free_port(host:str) -> int:
+    """Ask the operating system for a port that is free to bind on a given host"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]  # type: ignore[no-any-return]
+
+
 class ProxySvc:
-    def __init__(self, host: str = os.environ.get('HOST', '0.0.0.0'), port: int|None = None):
+    """FlareSolverr proxy service and its pool of browser sessions
+
+    Browser sessions are created lazily, up to the pool size, and handed out one caller
+        at a time, so that concurrent lookups are spread across separate headless
+        browsers rather than queueing behind one. Sessions are recycled (destroyed, and
+        recreated on demand) after a number of uses, or when a lookup using them fails.
+
+    While the server runs, a background monitor sends it a heartbeat at a fixed interval,
+        so that liveness can be checked through `is_healthy` without a request of its own.
+        If the server process dies, its sessions are dropped and the failure is reported.
+
+    Unless a port is given, the server is started on a free port chosen by the operating
+        system, so that several instances may run side by side.
+
+    Attributes:
+        session_pool_size (int): Maximum number of browser sessions kept open
+        max_session_uses (int): Number of lookups after which a session is recycled
+        heartbeat_interval (float): Seconds between heartbeats
+        startup_timeout (float): Seconds to wait for the server to become ready
+    """
+    def __init__(
+            self,
+            host: str = os.environ.get('HOST', '0.0.0.0'),
+            port: int|None = None,
+            session_pool_size: int|None = None,
+        ):
         self.server_host: str = host
-        self.server_port: int = port if port is not None else 54011 # TODO Change to 0 when dynamic added to flaresolverr  # fmt: skip # noqa: E501
+        self.server_port: int = port if port is not None else 0 # Chosen when started
+        self.startup_timeout: float = 30.0
         self.__stop_event: EventType = multiprocessing.Event()
+        self.__failed_event: EventType = multiprocessing.Event()
         self.__server_process: multiprocessing.Process = multiprocessing.Process(
-            target=self._start_async_server, args=(self.__stop_event,)
+            target=self._start_async_server,
+            args=(self.server_host, self.server_port, self.__stop_event, self.__failed_event),
         )
         self.primary_proxy_url: str|None = None
         self.primary_session_id: str|None = None
 
+        if session_pool_size is None:
+            session_pool_size = int(config['General']['flaresolverr_sessions'])
+        self.session_pool_size: int = max(1, session_pool_size)
+        self.max_session_uses: int = 50 # Long-lived browsers accumulate memory and stale state
+        self.__sessions_available: threading.Condition = threading.Condition()
+        self.__idle_sessions: Deque[str] = deque()
+        self.__session_uses: Dict[str, int] = {} # Every open pool session, whether idle or in use
+        self.__pending_sessions: int = 0
+
+        self.heartbeat_interval: float = 5.0
+        self.__healthy: bool = False
+        self.__last_heartbeat: float = 0.0
+        self.__monitor_stop_event: threading.Event = threading.Event()
+
         # FIXME: Remove when FlareSolverr nonsense is fixed
         if os.environ.get('SYLVA_ENV', 'tty') == 'docker':
             def _call_flaresolverr_module() -> None:
@@ -76,33 +132,42 @@ class ProxySvc:
         self.stop()
 
 
-    def _start_async_server(self, stop_event: EventType) -> None:
+    @staticmethod
+    def _start_async_server(server_host: str, server_port: int, stop_event: EventType, failed_event: EventType) -> None:
         """
         Start the FlareSolverr server asynchronously and monitor the stop event.
+        Failure to start is signalled through the failed event, so the parent need not wait out its timeout.
+
+        Static, with its arguments given explicitly, so that the service itself (and the thread
+        primitives it holds) need not be pickled when processes are spawned rather than forked.
         """
         sys.stdout = open(os.devnull, 'w')
         try:
             if loglevel >= LogLevel.INFO.value:
                 print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Starting FlareSolverr...')
             while not stop_event.is_set():
-                run(server_host=self.server_host, server_port=self.server_port)
+                run(server_host=server_host, server_port=server_port)
         except Exception:
+            failed_event.set()
             if loglevel >= LogLevel.INFO.value:
                 print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Unable to start FlareSolverr, proceeding without it')  # fmt: skip # noqa: E501
         else:
             if loglevel >= LogLevel.INFO.value:
-                print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Started FlareSolverr on {self.server_host}:{self.server_port}')  # fmt: skip # noqa: E501
+                print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Started FlareSolverr on {server_host}:{server_port}')  # fmt: skip # noqa: E501
 
 
     def stop(self) -> None:
         """
         Stop the server by setting the stop event and joining the process.
         """
+        self.__monitor_stop_event.set()
+        self.__healthy = False
         if self.__server_process.is_alive():
             if loglevel >= LogLevel.DEBUG.value:
                 print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Stopping FlareSolverr...')
             self.__stop_event.set()
             self.__server_process.terminate()
+            self.__forget_sessions() # Sessions do not outlive the server
             if not self.__server_process.is_alive():
                 if loglevel >= LogLevel.DEBUG.value:
                     print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} Stopped FlareSolverr')
@@ -120,28 +185,110 @@ class ProxySvc:
         """
         if not self.__server_process.is_alive():
             self.__stop_event.clear()  # Reset the stop event in case it was set before
+            self.__failed_event.clear()
+            if self.server_port == 0:
+                self.server_port = _find_free_port(self.server_host)
             self.__server_process = multiprocessing.Process(
-                target=self._start_async_server, args=(self.__stop_event,)
+                target=self._start_async_server,
+                args=(self.server_host, self.server_port, self.__stop_event, self.__failed_event),
             )
             self.__server_process.start()
             self.server_host = self.server_host if self.server_host != '0.0.0.0' else '127.0.0.1'
             self.primary_proxy_url = f'http://{self.server_host}:{self.server_port}/v1'
 
-            for i in range(6):
-                if test_if_flaresolverr_online(proxy_url=self.primary_proxy_url):
-                    break
-                time.sleep(0.5)
-            else:
-                raise Exception('FlareSolverr failed to start for an unknown reason')
+            self.__wait_until_ready()
 
+            self.__healthy = True
+            self.__last_heartbeat = time.monotonic()
+            self.__monitor_stop_event = threading.Event()
+            threading.Thread(
+                target=self._monitor_heartbeat,
+                args=(weakref.ref(self), self.__monitor_stop_event, self.heartbeat_interval),
+                name='flaresolverr-heartbeat',
+                daemon=True,
+            ).start()
 
-    def start_primary_session(self) -> str:
-        if not test_if_flaresolverr_online(proxy_url=self.primary_proxy_url):  # type: ignore[arg-type]
-            raise Exception('FlareSolverr is not online')
 
-        if self.primary_session_id:
-            return self.primary_session_id
+    def __wait_until_ready(self) -> None:
+        """Wait for the server to accept connections, or for its process to signal failure
+
+        Readiness is polled with bare TCP connections, which are refused until the server
+            binds, before a single request confirms that FlareSolverr is answering.
+        """
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.__failed_event.is_set() or not self.__server_process.is_alive():
+                raise Exception('FlareSolverr exited during startup')
+            try:
+                with socket.create_connection((self.server_host, self.server_port), timeout=0.1):
+                    pass
+            except OSError:
+                self.__failed_event.wait(timeout=0.05)
+                continue
+            if test_if_flaresolverr_online(proxy_url=self.primary_proxy_url):  # type: ignore[arg-type]
+                return
+            self.__failed_event.wait(timeout=0.05)
+
+        raise Exception('FlareSolverr failed to start for an unknown reason')
+
+
+    @property
+    def is_healthy(self) -> bool:
+        """Whether FlareSolverr is online, as of the most recent heartbeat
+
+        If the heartbeat has lapsed (as when the server was started elsewhere and is not
+            monitored), the server is probed once and the result kept for next time.
+        """
+        if self.primary_proxy_url is None:
+            return False
+        if time.monotonic() - self.__last_heartbeat > 2 * self.heartbeat_interval:
+            self.__check_heartbeat()
+        return self.__healthy
+
+
+    def __server_alive(self) -> bool:
+        """Whether the server process is running, or True if the server was not started here"""
+        return self.__server_process.pid is None or self.__server_process.is_alive()
 
+
+    def __check_heartbeat(self) -> None:
+        """Probe the server, reporting and failing over when it goes down or comes back"""
+        was_healthy = self.__healthy
+        server_alive = self.__server_alive()
+        self.__healthy = server_alive and test_if_flaresolverr_online(proxy_url=self.primary_proxy_url)  # type: ignore[arg-type]
+        self.__last_heartbeat = time.monotonic()
+
+        if not server_alive:
+            self.__forget_sessions() # Browsers died with the server
+
+        if was_healthy and not self.__healthy:
+            if loglevel >= LogLevel.INFO.value:
+                print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} FlareSolverr {"stopped unexpectedly" if not server_alive else "stopped responding"}, proceeding without it')  # fmt: skip # noqa: E501
+        elif not was_healthy and self.__healthy:
+            if loglevel >= LogLevel.DEBUG.value:
+                print(f'{Fore.LIGHTBLACK_EX}{Style.BRIGHT}[-]{Style.RESET_ALL}{Fore.RESET} FlareSolverr is responding again')  # fmt: skip # noqa: E501
+
+
+    @staticmethod
+    def _monitor_heartbeat(proxy_ref:weakref.ref, stop_event:threading.Event, interval:float) -> None:
+        """Send heartbeats until stopped, holding only a weak reference so the service can still be collected"""
+        while not stop_event.wait(timeout=interval):
+            proxy_svc:ProxySvc|None = proxy_ref()
+            if proxy_svc is None:
+                return
+            proxy_svc.__check_heartbeat()
+            del proxy_svc
+
+
+    def create_session(self) -> str:
+        """Create a new FlareSolverr browser session
+
+        Returns:
+            str -- The ID of the new session
+
+        Raises:
+            RequestError -- If FlareSolverr fails to create the session
+        """
         response = requests.post(
             url=self.primary_proxy_url,  # type: ignore[arg-type]
             json={
@@ -150,17 +297,156 @@ class ProxySvc:
         )
 
         if response.status_code != 200 or 'message' not in response.json():
-            raise Exception('Unable to properly communicate with FlareSolverr')
+            raise RequestError(message='Unable to properly communicate with FlareSolverr')
         if response.json()['message'] != 'Session created successfully.':
-            raise Exception('Failed to create primary session')
+            raise RequestError(message='Failed to create browser session')
+
+        return response.json()['session']  # type: ignore[no-any-return]
+
+
+    def destroy_session(self, session_id:str) -> None:
+        """Destroy a FlareSolverr browser session
+
+        Keyword Arguments:
+            session_id {str} -- The ID of the session to destroy
+        """
+        response = requests.post(
+            url=self.primary_proxy_url,  # type: ignore[arg-type]
+            json={
+                'cmd': 'sessions.destroy',
+                'session': session_id,
+            },
+        )
+        if response.status_code != 200:
+            raise RequestError(message='Unable to properly communicate with FlareSolverr')
+        if response.json()['msg'] != 'Session destroyed successfully.':
+            raise RequestError(message='Failed to destroy browser session')
+
+
+    def acquire_session(self, timeout:float|None=None) -> str:
+        """Take a browser session from the pool for exclusive use
+
+        Idle sessions are reused first. If none are idle and the pool is not full, a new
+            session is created. Otherwise, waits for a session to be released.
+
+        Keyword Arguments:
+            timeout {float} -- Seconds to wait for a session, or None to wait indefinitely (default: {None})
+
+        Returns:
+            str -- The ID of the acquired session, to be returned with release_session
+
+        Raises:
+            RequestError -- If no session could be created, or none was released within the timeout
+        """
+        with self.__sessions_available:
+            while not self.__idle_sessions:
+                if len(self.__session_uses) + self.__pending_sessions < self.session_pool_size:
+                    self.__pending_sessions += 1
+                    break
+                if not self.__sessions_available.wait(timeout=timeout):
+                    raise RequestError(message='No FlareSolverr session became available')
+            else:
+                return self.__idle_sessions.popleft()
+
+        # Browser startup is slow, so sessions are created outside the lock
+        try:
+            session_id = self.create_session()
+        except Exception:
+            with self.__sessions_available:
+                self.__pending_sessions -= 1
+                self.__sessions_available.notify()
+            raise
+
+        with self.__sessions_available:
+            self.__pending_sessions -= 1
+            self.__session_uses[session_id] = 0
+        return session_id
+
+
+    def release_session(self, session_id:str, healthy:bool=True) -> None:
+        """Return a browser session to the pool
+
+        Sessions that failed, or that have reached max_session_uses, are destroyed and
+            will be replaced on demand.
+
+        Keyword Arguments:
+            session_id {str} -- The ID of the session, as given by acquire_session
+            healthy {bool} -- False if the session failed and should be recycled (default: {True})
+        """
+        with self.__sessions_available:
+            if session_id not in self.__session_uses:
+                return # Pool was cleared while the session was in use
+            self.__session_uses[session_id] += 1
+            recycle = not healthy or self.__session_uses[session_id] >= self.max_session_uses
+            if recycle:
+                del self.__session_uses[session_id]
+                if session_id == self.primary_session_id:
+                    self.primary_session_id = None
+            else:
+                self.__idle_sessions.append(session_id)
+            self.__sessions_available.notify()
+
+        if recycle:
+            try:
+                self.destroy_session(session_id)
+            except Exception:
+                pass # Already gone with a crashed browser, or otherwise unrecoverable
+
 
-        self.primary_session_id = response.json()['session']
+    @contextmanager
+    def session(self, timeout:float|None=None) -> Iterator[str]:
+        """Hold a browser session from the pool for the duration of a block
 
-        return self.primary_session_id  # type: ignore[return-value]
+        Example:
+            ```python
+            with proxy_svc.session() as session_id:
+                ... # Request through FlareSolverr with session_id
+            ```
+
+        If the block raises, the session is recycled rather than reused.
+
+        Keyword Arguments:
+            timeout {float} -- Seconds to wait for a session, or None to wait indefinitely (default: {None})
+        """
+        session_id = self.acquire_session(timeout=timeout)
+        healthy = False
+        try:
+            yield session_id
+            healthy = True
+        finally:
+            self.release_session(session_id, healthy=healthy)
+
+
+    def __forget_sessions(self) -> None:
+        """Drop all pool sessions without destroying them, as when the server is gone"""
+        with self.__sessions_available:
+            self.__idle_sessions.clear()
+            self.__session_uses.clear()
+            self.primary_session_id = None
+            self.__sessions_available.notify_all()
+
+
+    def start_primary_session(self) -> str:
+        """Open the first session of the pool, so that the first lookup need not wait on browser startup
+
+        Returns:
+            str -- The ID of the session
+        """
+        if not self.is_healthy:
+            raise Exception('FlareSolverr is not online')
+
+        if self.primary_session_id:
+            return self.primary_session_id
+
+        session_id = self.acquire_session()
+        self.primary_session_id = session_id
+        self.release_session(session_id)
+
+        return session_id
 
 
     def destroy_all_sessions(self) -> None:
-        if not test_if_flaresolverr_online(proxy_url=self.primary_proxy_url):  # type: ignore[arg-type]
+        if not self.is_healthy:
             raise Exception('FlareSolverr is not online')
 
         response = requests.post(
@@ -173,16 +459,7 @@ class ProxySvc:
             raise Exception('Unable to properly communicate with FlareSolverr')
 
         sessions: list[str] = response.json()['sessions']
+        self.__forget_sessions()
 
         for session in sessions:
-            response = requests.post(
-                url=self.primary_proxy_url,  # type: ignore[arg-type]
-                json={
-                    'cmd': 'sessions.destroy',
-                    'session': session,
-                },
-            )
-            if response.status_code != 200:
-                raise Exception('Unable to properly communicate with FlareSolverr')
-            if response.json()['msg'] != 'Session destroyed successfully.':
-                raise Exception('Failed to destroy primary session')
+            self.destroy_session(session)
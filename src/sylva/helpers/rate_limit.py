@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+
+from ..config import config
+from ..errors import RequestError
+
+
+class RateLimiter:
+    """Token bucket pacing requests to a single source
+
+    Requests are spaced by a minimum interval, with up to `burst` requests permitted
+        back to back. The bucket adapts to the source's own accounting: when a response
+        reports that quota is exhausted (X-RateLimit-Remaining and X-RateLimit-Reset) or
+        asks for a pause (Retry-After, or a 429 without further detail), all further
+        requests are parked until the quota returns.
+
+    Slots are reserved under a lock, so a limiter may be shared between threads and
+        coroutines alike. Waits longer than max_wait raise a rate limit RequestError
+        rather than stalling the search.
+
+    Attributes:
+        interval (float): Minimum seconds between requests, once the burst is spent
+        burst (int): Number of requests permitted without waiting
+        max_wait (float): Longest wait, in seconds, before a request is abandoned
+        remaining (float|None): Requests remaining in the source's quota, as last reported
+    """
+    _default_backoff:float = 5.0 # When a source rate limits without saying for how long
+
+    def __init__(self, interval:float=0.0, burst:int=1, max_wait:float|None=None) -> None:
+        """Initialize the rate limiter
+
+        Keyword Arguments:
+            interval {float} -- Minimum seconds between requests (default: {0.0})
+            burst {int} -- Number of requests permitted without waiting (default: {1})
+            max_wait {float} -- Longest wait before a request is abandoned (default: {[HTTP] rate_limit_max_wait})
+        """
+        self.interval:float = interval
+        self.burst:int = max(1, burst)
+        self.max_wait:float = max_wait if max_wait is not None else float(config['HTTP']['rate_limit_max_wait'])
+        self.remaining:float|None = None
+        self.__theoretical_arrival:float = 0.0
+        self.__parked_until:float = 0.0
+        self.__lock:threading.Lock = threading.Lock()
+
+
+    def reserve(self) -> float:
+        """Reserve the next request slot
+
+        Returns:
+            float -- Seconds to wait before the request may be sent
+
+        Raises:
+            RequestError -- If the wait would exceed max_wait
+        """
+        with self.__lock:
+            now = time.monotonic()
+            arrival = max(self.__theoretical_arrival, now)
+            start = max(now, arrival - (self.burst - 1) * self.interval, self.__parked_until)
+            wait = start - now
+            if wait > self.max_wait:
+                raise RequestError(message=f'Rate limited for {wait:.0f} seconds', rate_limit_exceeded=True)
+            self.__theoretical_arrival = max(arrival, start) + self.interval
+            return wait
+
+
+    def acquire(self) -> None:
+        """Block until the next request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until the next request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+    def park(self, seconds:float) -> None:
+        """Hold all further requests for a given number of seconds"""
+        with self.__lock:
+            self.__parked_until = max(self.__parked_until, time.monotonic() + seconds)
+
+
+    def update(self, status_code:int, headers:Mapping[str, str]) -> bool:
+        """Adapt to the rate limit state reported by a response
+
+        Keyword Arguments:
+            status_code {int} -- The status code of the response
+            headers {Mapping[str, str]} -- The (case-insensitive) headers of the response
+
+        Returns:
+            bool -- True if the request was rejected for rate limiting and should be retried
+        """
+        retry_after = self.__parse_retry_after(headers.get('Retry-After'))
+        remaining = self.__parse_float(headers.get('X-RateLimit-Remaining'))
+        reset = self.__seconds_until_reset(headers.get('X-RateLimit-Reset'))
+        exhausted = remaining is not None and remaining < 1
+        if remaining is not None:
+            self.remaining = remaining
+
+        if retry_after is not None:
+            self.park(retry_after)
+        elif exhausted and reset is not None:
+            self.park(reset)
+        elif status_code == 429:
+            self.park(self._default_backoff)
+
+        return status_code == 429 or (status_code == 403 and (exhausted or retry_after is not None))
+
+
+    @staticmethod
+    def __parse_float(value:str|None) -> float|None:
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+
+    @classmethod
+    def __parse_retry_after(cls, value:str|None) -> float|None:
+        """Parse Retry-After, given either in seconds or as an HTTP date"""
+        seconds = cls.__parse_float(value)
+        if seconds is not None or value is None:
+            return seconds
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+    @classmethod
+    def __seconds_until_reset(cls, value:str|None) -> float|None:
+        """Parse X-RateLimit-Reset, given by some sources as epoch time and others as seconds remaining"""
+        reset = cls.__parse_float(value)
+        if reset is None:
+            return None
+        if reset > 1e9: # Epoch time (GitHub), rather than a duration (Reddit)
+            reset -= time.time()
+        return max(0.0, reset)
@@ -0,0 +1,83 @@
+import json
+import os
+import time
+from typing import Dict
+
+import requests
+
+from ..cache import get_cache_dir
+from ..config import config
+from .http_client import HttpClient
+
+
+def fetch_cached(url:str, filename:str, max_age:int|None=None, http:HttpClient|None=None) -> str:
+    """Fetch a remote file, keeping a copy on disk that is revalidated when stale
+
+    Fresh copies are used without touching the network. Stale copies are revalidated
+        with a conditional request (ETag and Last-Modified), so unchanged files are not
+        downloaded again. If the remote is unavailable, a stale copy is used regardless.
+
+    Keyword Arguments:
+        url {str} -- The URL of the remote file
+        filename {str} -- The name to store the file under within the cache directory
+        max_age {int} -- Seconds before the local copy is revalidated (default: {[Cache] ttl})
+        http {HttpClient} -- Shared HTTP client to fetch with (default: {new client})
+
+    Returns:
+        str -- Path to the local copy
+
+    Raises:
+        FileNotFoundError -- If the file could be neither fetched nor found on disk
+    """
+    if max_age is None:
+        max_age = int(config['Cache']['ttl'])
+
+    local_path:str = os.path.join(get_cache_dir(), filename)
+    metadata_path:str = f'{local_path}.meta.json'
+
+    metadata:Dict = {}
+    if os.path.isfile(local_path) and os.path.isfile(metadata_path):
+        try:
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            metadata = {}
+
+    if metadata and time.time() - metadata.get('fetched', 0) < max_age:
+        return local_path
+
+    headers:Dict[str, str] = {}
+    if 'etag' in metadata:
+        headers['If-None-Match'] = metadata['etag']
+    if 'last_modified' in metadata:
+        headers['If-Modified-Since'] = metadata['last_modified']
+
+    try:
+        response = (http if http is not None else HttpClient()).get(url, headers=headers)
+    except requests.exceptions.RequestException as e:
+        if os.path.isfile(local_path):
+            return local_path
+        raise FileNotFoundError(f'Unable to fetch {url}: {e}')
+
+    if response.status_code == 304:
+        metadata['fetched'] = time.time()
+    elif response.status_code == 200:
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        temporary_path = f'{local_path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(temporary_path, local_path) # Atomic, so concurrent readers never see a partial file
+        metadata = {'fetched': time.time()}
+        if 'ETag' in response.headers:
+            metadata['etag'] = response.headers['ETag']
+        if 'Last-Modified' in response.headers:
+            metadata['last_modified'] = response.headers['Last-Modified']
+    elif os.path.isfile(local_path):
+        return local_path
+    else:
+        raise FileNotFoundError(f'Unable to fetch {url}: status code {response.status_code}')
+
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+
+    return local_path
@@ -3,16 +3,16 @@ from typing import Dict
 
 import pandas as pd
 import phonenumbers
-import requests
 
 from ..collector import Collector
 from ..config import config
 from ..errors import APIKeyError, IncompatibleQueryType, RequestError
+from ..helpers.http_client import HttpClient
 from ..types import QueryType, SearchArgs
 
 
 class Endato:
-    def __init__(self, collector:Collector, api_name:str, api_key:str, country:str):
+    def __init__(self, collector:Collector, api_name:str, api_key:str, country:str, http:HttpClient|None=None):
         self.__api_name:str = api_name
         self.__api_key:str = api_key
         self.__api_url:Dict[str, str] = {
@@ -29,6 +29,7 @@ class Endato:
         self.source_obtain_keys_url:str = 'https://api.endato.com/Keys'
         self.source_name:str = 'Endato'
         self.collector:Collector = collector
+        self.http:HttpClient = http if http is not None else HttpClient()
 
 
     def _type(self, query:str) -> QueryType:
@@ -83,7 +84,7 @@ class Endato:
             'ResultsPerPage': 3,
         }
 
-        response = requests.post(self.__api_url['phone'], headers=headers, data=values)
+        response = self.http.post(self.__api_url['phone'], headers=headers, data=values)
         if response.status_code != 200:
             raise RequestError(f'Failed to get results from Endato. Status code: {response.status_code}\n\n{response.text}')  # fmt: skip # noqa: E501
         json_data:dict = json.loads(response.text)
@@ -10,6 +10,8 @@ import time
 
 import requests
 
+from ..helpers.rate_limit import RateLimiter
+
 # http.client.HTTPConnection.debuglevel = 1  # DEBUG
 
 # logging.basicConfig()  # DEBUG
@@ -33,6 +35,7 @@ class IntelX_API:
         self.API_KEY = key
         self.USER_AGENT = ua
         self.API_RATE_LIMIT = 1
+        self.rate_limiter = RateLimiter(interval=self.API_RATE_LIMIT)
         self.HEADERS = {'X-Key': self.API_KEY, 'User-Agent': self.USER_AGENT}
 
     def get_error(self, code):
@@ -72,7 +75,7 @@ class IntelX_API:
         """
         Return a JSON object with the current user's API capabilities
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         h = {'x-key': self.API_KEY, 'User-Agent': self.USER_AGENT}
         r = requests.get(f"{self.API_ROOT}/authenticate/info", headers=h)
         return r.json()
@@ -84,7 +87,7 @@ class IntelX_API:
         - 0: Text
         - 1: Picture
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         r = requests.get(f"{self.API_ROOT}/file/preview?c={ctype}&m={mediatype}&f={format}&sid={sid}&b={bucket}&e={e}&l={lines}&k={self.API_KEY}")
         return r.text
 
@@ -120,7 +123,7 @@ class IntelX_API:
             format = 0
         else:
             format = 1
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         r = requests.get(f"{self.API_ROOT}/file/view?f={format}&storageid={sid}&bucket={bucket}&escape={escape}&k={self.API_KEY}")
         return r.text
 
@@ -142,7 +145,7 @@ class IntelX_API:
         name option:
         - Specify the name to save the file as (e.g document.pdf).
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         h = {'x-key': self.API_KEY, 'User-Agent': self.USER_AGENT}
         r = requests.get(f"{self.API_ROOT}/file/read?type={type}&systemid={id}&bucket={bucket}", headers=h, stream=True)
         with open(f"{filename}", "wb") as f:
@@ -153,7 +156,7 @@ class IntelX_API:
         """
         Show a treeview of an item that has multiple files/folders
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         try:
             r = requests.get(f"{self.API_ROOT}/file/view?f=12&storageid={sid}&k={self.API_KEY}", timeout=5)
             if "Could not generate" in r.text:
@@ -257,7 +260,7 @@ class IntelX_API:
             "media": media,
             "terminate": terminate
         }
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         r = requests.post(self.API_ROOT + '/intelligent/search', headers=h, json=p)
         if r.status_code == 200:
             if r.json()['status'] == 1:
@@ -348,7 +351,7 @@ class IntelX_API:
         - Identifiers of related items
 
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         h = {'x-key': self.API_KEY, 'User-Agent': self.USER_AGENT}
         r = requests.get(self.API_ROOT + f'/intelligent/search/result?id={id}&limit={limit}', headers=h)
         if(r.status_code == 200):
@@ -360,7 +363,7 @@ class IntelX_API:
         """
         Terminate a previously initialized search based on its UUID.
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         h = {'x-key': self.API_KEY, 'User-Agent': self.USER_AGENT}
         r = requests.get(self.API_ROOT + f'/intelligent/search/terminate?id={uuid}', headers=h)
         if(r.status_code == 200):
@@ -372,7 +375,7 @@ class IntelX_API:
         """
         Initialize a phonebook search and return the ID of the task/search for further processing
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         h = {'x-key': self.API_KEY, 'User-Agent': self.USER_AGENT}
         p = {
             "term": term,
@@ -406,7 +409,7 @@ class IntelX_API:
         - 2: Search ID not found.
         - 3: No results yet, but keep trying.
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         h = {'x-key': self.API_KEY, 'User-Agent': self.USER_AGENT}
         r = requests.get(self.API_ROOT + f'/phonebook/search/result?id={id}&limit={limit}&offset={offset}', headers=h)
         if(r.status_code == 200):
@@ -436,7 +439,7 @@ class IntelX_API:
           a. Historical copies of websites. Use the storage ID from the field "historyfile" in the search result.
           b. List of indexed sub-pages for a given website. Use the storage ID from the field "indexfile" in the search result.
         """
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         h = {'x-key': self.API_KEY, 'User-Agent': self.USER_AGENT}
         r = requests.get(self.API_ROOT + f'/file/view?f=13&storageid={id}&bucket={bucket}', headers=h)
 
@@ -580,6 +583,6 @@ class IntelX_API:
         return json.dumps(stats)
 
     def selectors(self, document):
-        time.sleep(self.API_RATE_LIMIT)
+        self.rate_limiter.acquire()
         r = requests.get(self.API_ROOT + f'/item/selector/list/human?id={document}&k={self.API_KEY}')
         return r.json()['selectors']
@@ -7,11 +7,12 @@ import requests
 
 from ..collector import Collector
 from ..errors import IncompatibleQueryType, RequestError
+from ..helpers.http_client import HttpClient
 from ..types import QueryType, SearchArgs
 
 
 class Veriphone:
-    def __init__(self, collector:Collector, api_key:str, country:str):
+    def __init__(self, collector:Collector, api_key:str, country:str, http:HttpClient|None=None):
         self.__api_url:str = 'https://api.veriphone.io/v2/verify?key={KEY}&default_country={COUNTRY}&phone={PHONE}'
         self.__api_key:str = api_key
         self.__country:str = country
@@ -19,6 +20,7 @@ class Veriphone:
         self.source_name:str = 'Veriphone'
         self.source_obtain_keys_url:str = 'https://veriphone.io/cp'
         self.collector:Collector = collector
+        self.http:HttpClient = http if http is not None else HttpClient()
     # TODO add validation for username, email, password
 
 
@@ -54,7 +56,7 @@ class Veriphone:
         )
 
         sanitized_query = requests.utils.requote_uri(e164_query)
-        response = requests.get(
+        response = self.http.get(
             self.__api_url.format(KEY=self.__api_key, COUNTRY=self.__country, PHONE=sanitized_query)
         )
         if response.status_code != 200:
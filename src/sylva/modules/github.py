@@ -1,16 +1,62 @@
 import asyncio
+import concurrent.futures
 import re
-import time
-from typing import Dict, List, NamedTuple
+import threading
+import weakref
+from typing import Any, Coroutine, Dict, List, NamedTuple, Tuple, TypeVar
 
 import aiohttp
 import pandas as pd
 import requests
 
-from .. import Collector
-from ..errors import IncompatibleQueryType
+from .. import Collector, __user_agent__
+from ..config import config
+from ..errors import IncompatibleQueryType, RequestError
+from ..helpers.http_client import HttpClient
+from ..helpers.rate_limit import RateLimiter
 from ..types import QueryType, SearchArgs
 
+T = TypeVar('T')
+
+
+class _EventLoopResources:
+    """Event loop, its thread, and the aiohttp session bound to it
+
+    Held apart from the module so that a finalizer can release them without keeping
+        the module itself alive.
+    """
+    def __init__(self) -> None:
+        self.loop:asyncio.AbstractEventLoop|None = None
+        self.thread:threading.Thread|None = None
+        self.session:aiohttp.ClientSession|None = None
+
+
+def _release_event_loop(resources:_EventLoopResources, timeout:float) -> None:
+    """Close the session and stop the loop, waiting on the loop thread no longer than the timeout
+
+    The loop thread is a daemon, so at interpreter shutdown it may no longer be running.
+        If it does not respond in time, the session and loop are abandoned rather than
+        waited on.
+    """
+    loop, resources.loop = resources.loop, None
+    thread, resources.thread = resources.thread, None
+    session, resources.session = resources.session, None
+    if loop is None or loop.is_closed():
+        return
+
+    if thread is not None and thread.is_alive():
+        try:
+            if session is not None:
+                asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=timeout)
+            loop.call_soon_threadsafe(loop.stop)
+        except (concurrent.futures.TimeoutError, RuntimeError):
+            return
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            return
+
+    loop.close()
+
 
 class IdentItem(NamedTuple):
     full_name: str
@@ -24,9 +70,10 @@ class IdentItem(NamedTuple):
 
 class GitHub:
     """Scrapes GitHub for data relating to a given username"""
-    def __init__(self, collector:Collector, api_key:str):
+    def __init__(self, collector:Collector, api_key:str, http:HttpClient|None=None):
         self.source_name:str = 'GitHub'
         self.collector:Collector = collector
+        self.http:HttpClient = http if http is not None else HttpClient()
         self.__username_validation_pattern: str = r'^((?!.*(-){2,}.*)[a-z0-9][a-z0-9-]{0,38}[a-z0-9])$'
         self.__email_validation_pattern: str = r'^[^@]+@[^@]+\.[^@]+$'
         self.__page_length:int = 100
@@ -41,31 +88,124 @@ class GitHub:
         if api_key != '':
             self.__generic_headers['Authorization'] = f'Bearer {api_key}'
 
+        # The search API permits 30 requests per minute with a key, or 10 without. The core API
+        # has a much larger hourly allowance, so is paced by its rate limit headers alone.
+        if api_key != '':
+            self.__search_rate_limiter:RateLimiter = RateLimiter(interval=2.0, burst=30)
+        else:
+            self.__search_rate_limiter = RateLimiter(interval=6.0, burst=10)
+        self.__core_rate_limiter:RateLimiter = RateLimiter()
+        self.__max_attempts:int = 3
+
+        # A single event loop and aiohttp session are kept for the life of the module, so that
+        # connections are reused across the many usernames searched in a branch run
+        self.__loop_resources:_EventLoopResources = _EventLoopResources()
+        self.__loop_lock:threading.Lock = threading.Lock()
+        self.__loop_finalizer:weakref.finalize|None = None
+        self.__close_timeout:float = 5.0
+
+        # Profiles are revalidated with If-None-Match, as GitHub does not count 304 responses against the quota
+        self.__max_profile_workers:int = 8
+        self.__max_cached_profiles:int = 1024
+        self.__profile_cache:Dict[str, Tuple[str, Dict]] = {}
+
+
+    def close(self) -> None:
+        """Close the module's aiohttp session and stop its event loop
+
+        If not called, the same happens when the module is collected or the interpreter
+            exits, through a finalizer registered when the loop is started.
+        """
+        with self.__loop_lock:
+            finalizer, self.__loop_finalizer = self.__loop_finalizer, None
+        if finalizer is not None:
+            finalizer()
+
+
+    def __run(self, coroutine:Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the module's event loop, starting the loop if necessary
+
+        The loop runs in its own thread, so this may be called from any runner thread.
+        """
+        with self.__loop_lock:
+            resources = self.__loop_resources
+            if resources.loop is None:
+                resources.loop = asyncio.new_event_loop()
+                resources.thread = threading.Thread(
+                    target=resources.loop.run_forever,
+                    name=f'{self.source_name} event loop',
+                    daemon=True,
+                )
+                resources.thread.start()
+                # Runs on close(), on collection, or at exit (before daemon threads are frozen)
+                self.__loop_finalizer = weakref.finalize(self, _release_event_loop, resources, self.__close_timeout)
+            loop = resources.loop
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        """Get the module's aiohttp session. Must be called from within the module's event loop."""
+        resources = self.__loop_resources
+        if resources.session is None or resources.session.closed:
+            resources.session = aiohttp.ClientSession(
+                headers={'User-Agent': __user_agent__},
+                timeout=aiohttp.ClientTimeout(total=float(config['HTTP']['timeout'])),
+            )
+        return resources.session
+
 
     async def __get_page(self, session:aiohttp.ClientSession, url:str, headers:Dict[str, str]):  # type: ignore[no-untyped-def] # (unk. return type)
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
+        for _ in range(self.__max_attempts):
+            try:
+                await self.__search_rate_limiter.acquire_async()
+            except RequestError:
+                return None # Quota won't return soon enough; keep whichever pages were fetched
+            async with session.get(url, headers=headers) as response:
+                # Successful responses carry the remaining quota too, so the limiter sees every response
+                rate_limited = self.__search_rate_limiter.update(response.status, response.headers)
+                if response.status == 200:
+                    return await response.json()
+                if rate_limited:
+                    continue
                 if response.status == 422: # username not found
                     return None
                 # TODO status code specific handling? is that needed?
                 return None
+        return None
+
 
+    async def __get_pages(self, url:str) -> Tuple[List[Dict], int]:
+        """Get each populated page of a paginated search
 
-    async def __get_pages(self, url:str):  # type: ignore[no-untyped-def]
-        # TODO Check for number of actually populated pages if account < maximum_query_depth values
-        # Without this check, rate limit may be exceeded more quickly
-        async with aiohttp.ClientSession() as session:
-            tasks = []
+        The first page is fetched alone to learn the total number of results, so that
+            only pages which actually exist are requested thereafter.
 
-            for page in range(1, (self.__maximum_query_depth // self.__page_length) + 1):
-                url = url.replace('<PAGE>', str(page))
-                tasks.append(self.__get_page(session=session, url=url, headers=self.__generic_headers))
+        Keyword Arguments:
+            url {str} -- The search URL, with a <PAGE> placeholder for the page number
 
-            results = await asyncio.gather(*tasks)
-            filtered_results = [result for result in results if result is not None]
-            return filtered_results
+        Returns:
+            Tuple[List[Dict], int] -- The fetched pages, and the total number of results
+        """
+        session = self.__get_session()
+        first_page = await self.__get_page(
+            session=session,
+            url=url.replace('<PAGE>', '1'),
+            headers=self.__generic_headers,
+        )
+        if first_page is None:
+            return [], 0
+
+        total_count:int = first_page.get('total_count', 0)
+        reachable_results:int = min(total_count, self.__maximum_query_depth)
+        last_page:int = -(-reachable_results // self.__page_length) # Ceiling division
+
+        tasks = [
+            self.__get_page(session=session, url=url.replace('<PAGE>', str(page)), headers=self.__generic_headers)
+            for page in range(2, last_page + 1)
+        ]
+        results = await asyncio.gather(*tasks)
+        filtered_results = [first_page] + [result for result in results if result is not None]
+        return filtered_results, total_count
 
 
     def __type(self, query:str) -> QueryType:
@@ -129,8 +269,11 @@ class GitHub:
 
         for order in ['desc', 'asc']:
             url = self.__api_endpoint_commit_search.format(PAGE_LEN=self.__page_length, USERNAME=username, ORDER=order )
-            loop = asyncio.get_event_loop()
-            pages.extend(loop.run_until_complete(self.__get_pages(url=url)))
+            new_pages, total_count = self.__run(self.__get_pages(url=url))
+            pages.extend(new_pages)
+            # The ascending pass only reaches commits beyond the search API's depth limit
+            if total_count <= self.__maximum_query_depth:
+                break
 
         for page in pages:
             for item in page['items']:
@@ -157,6 +300,66 @@ class GitHub:
         return new_data
 
 
+    def __rate_limited_get(self, url:str, rate_limiter:RateLimiter) -> requests.Response:
+        """Get a given URL, waiting out rate limits rather than failing on them
+
+        Raises:
+            RequestError -- If the rate limit will not reset within the limiter's max_wait
+        """
+        for _ in range(self.__max_attempts):
+            rate_limiter.acquire()
+            response = self.http.get(url, headers=self.__generic_headers)
+            if not rate_limiter.update(response.status_code, response.headers):
+                break
+        return response
+
+
+    async def __get_profile(self, session:aiohttp.ClientSession, url:str, slots:asyncio.Semaphore) -> Dict|None:
+        """Get a user profile, revalidating any cached copy rather than fetching it again
+
+        Must be called from within the module's event loop, which also guards the profile cache.
+        """
+        async with slots:
+            for _ in range(self.__max_attempts):
+                headers = dict(self.__generic_headers)
+                cached_profile = self.__profile_cache.get(url)
+                if cached_profile is not None:
+                    headers['If-None-Match'] = cached_profile[0]
+                try:
+                    await self.__core_rate_limiter.acquire_async()
+                except RequestError:
+                    return None
+                async with session.get(url, headers=headers) as response:
+                    rate_limited = self.__core_rate_limiter.update(response.status, response.headers)
+                    if response.status == 304 and cached_profile is not None:
+                        return cached_profile[1]
+                    if response.status == 200:
+                        profile:Dict = await response.json()
+                        if 'ETag' in response.headers:
+                            self.__cache_profile(url, response.headers['ETag'], profile)
+                        return profile
+                    if rate_limited:
+                        continue
+                    return None
+        return None
+
+
+    def __cache_profile(self, url:str, etag:str, profile:Dict) -> None:
+        self.__profile_cache.pop(url, None)
+        if len(self.__profile_cache) >= self.__max_cached_profiles:
+            del self.__profile_cache[next(iter(self.__profile_cache))] # Oldest first
+        self.__profile_cache[url] = (etag, profile)
+
+
+    async def __get_profiles(self, urls:List[str]) -> List[Dict|None]:
+        """Get user profiles concurrently, bounded by the remaining rate limit budget"""
+        budget = self.__core_rate_limiter.remaining
+        workers = self.__max_profile_workers if budget is None else int(min(self.__max_profile_workers, budget))
+        slots = asyncio.Semaphore(max(1, workers))
+        session = self.__get_session()
+        return await asyncio.gather(*[self.__get_profile(session=session, url=url, slots=slots) for url in urls])
+
+
     def search_accounts_by_keyword(
             self,
             username:str|None=None,
@@ -187,33 +390,17 @@ class GitHub:
 
         new_data: set = set()
 
-        r = requests.get(url)
+        r = self.__rate_limited_get(url, rate_limiter=self.__search_rate_limiter)
         if r.status_code != 200:
             return pd.DataFrame()
         data_raw = r.json()
-        for item in data_raw['items']:
-            if item['type'] != 'User':
-                # TODO Should we process organizational accounts?
-                continue
-            profile_data_url = item['url']
-
-            for attempt in range(3):
-                profile_data = requests.get(profile_data_url)
-                if profile_data.status_code == 200:
-                    break
-                if (
-                    profile_data.status_code == 429
-                    or (
-                        profile_data.status_code == 403
-                        and profile_data.json()['message'].startswith('API rate limit exceeded')
-                    )
-                ):
-                    # TODO Header X-RateLimit-Reset may be worth investigating (epoch time)
-                    time.sleep(5)
-            else:
+        # TODO Should we process organizational accounts?
+        profile_data_urls:List[str] = [item['url'] for item in data_raw['items'] if item['type'] == 'User']
+
+        for profile_data in self.__run(self.__get_profiles(profile_data_urls)):
+            if profile_data is None:
                 continue
 
-            profile_data = profile_data.json()
             email_found = profile_data['email'] if email is None else email  # type: ignore[index]
             new_data.add(IdentItem(
                 full_name = profile_data['name'],  # type: ignore[index]
@@ -10,6 +10,7 @@ from .. import Collector, __github_raw_data_url__, __short_name__
 from ..config import config
 from ..errors import IncompatibleQueryType
 from ..helpers import pgpy
+from ..helpers.http_client import HttpClient
 from ..types import QueryType, SearchArgs
 
 # FIXME GitLab PGP API seems to be broken. Documentation indicates no auth
@@ -18,13 +19,19 @@ from ..types import QueryType, SearchArgs
 prefer_local_manifest = True
 
 class TargetInformation:
-    def __init__(self) -> None:
+    def __init__(self, http:HttpClient) -> None:
         self._local_manifest_uri = f'{pathlib.Path(__file__).parent.resolve()}/../data/pgp.json'
         self._local_schema_uri = f'{pathlib.Path(__file__).parent.resolve()}/../data/pgp.schema.json'
         self._remote_manifest_uri = __github_raw_data_url__
 
-        r = requests.get(self._remote_manifest_uri)
-        if r.status_code != 200 or prefer_local_manifest:
+        r:requests.Response|None = None
+        if not prefer_local_manifest: # Don't pay for a fetch whose result would be discarded
+            try:
+                r = http.get(self._remote_manifest_uri)
+            except requests.exceptions.RequestException:
+                r = None
+
+        if r is None or r.status_code != 200:
             with open(self._local_manifest_uri, 'r') as f:
                 manifest_data:Dict = json.load(f)
         else:
@@ -39,11 +46,12 @@ class TargetInformation:
 
 
 class PGPModule:
-    def __init__(self, collector:Collector):
+    def __init__(self, collector:Collector, http:HttpClient|None=None):
         self.__debug_disable_tag:str = 'pgp'
         self.source_name:str = 'Sylva PGP'
         self.collector:Collector = collector
-        self.targets:TargetInformation = TargetInformation()
+        self.http:HttpClient = http if http is not None else HttpClient()
+        self.targets:TargetInformation = TargetInformation(http=self.http)
         self.__simple_email_regex = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
         self.__fingerprint_regex = r'^(?:[A-Fa-f0-9]{40}(?:[A-Fa-f0-9]{24})?)$'
         self.__keyid_regex = r'^(?:[A-Fa-f0-9]{16})$'
@@ -107,9 +115,9 @@ class PGPModule:
             if not sanitized_query:
                 sanitized_query = search_args.query
             if 'headers' in target:
-                response = requests.get(target['simple_url'].format(query=sanitized_query), headers=target['headers'])
+                response = self.http.get(target['simple_url'].format(query=sanitized_query), headers=target['headers'])
             else:
-                response = requests.get(target['simple_url'].format(query=sanitized_query))
+                response = self.http.get(target['simple_url'].format(query=sanitized_query))
             if response.status_code != 200:
                 continue
             raw_rows:List[Dict] = []
@@ -1,6 +1,9 @@
+import queue
 import re
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from typing import Iterable, Iterator
 
 import pandas as pd
 import requests
@@ -8,10 +11,82 @@ import requests
 from .. import Collector, __user_agent__
 from ..errors import RequestError
 from ..helpers.generic import compare_to_known, ref_list
+from ..helpers.http_client import HttpClient
 from ..helpers.nlp import NatLangProcessor
+from ..helpers.rate_limit import RateLimiter
+from ..helpers.remote_cache import fetch_cached
 from ..types import QueryType, SearchArgs
 
 RM_SUBREDDIT_CSV_URL = 'https://raw.githubusercontent.com/jibalio/redditmetis/master/backend/libraries/metis_core/subreddits.csv'
+RM_SUBREDDIT_CSV_COLUMNS = [
+    'name',            # Subreddit name
+    'topic_level1',    # Level 1 topic. For instance, Entertainment.
+    'topic_level2',    # Level 2 topic. For instance, TV Shows.
+    'topic_level3',    # Level 2 topic. For instance, Sherlock.
+    'default',         # Y if default sub, blank otherwise.
+    'ignore_text',     # Y if text in sub needs to be ignored, blank otherwise.
+    'sub_attribute',   # An attribute we can derive from this subreddit. i.e. sex, religion, gadget, etc.
+    'sub_value',       # Value for the above attribute. i.e. male, atheism, iPhone, etc.
+]
+
+MAX_WORD_LENGTH = 255
+
+# Applied in order. URLs are removed before ellipses are collapsed, which would otherwise split them apart.
+_normalization_substitutions:list[tuple[re.Pattern, str]] = [
+    (re.compile(r"\[(.*?)\]\((.*?)\)", re.I), r""),    # Remove links from Markdown
+    (re.compile(r"http.?:\S+\b", re.I), r" "),          # Remove URLs
+    (re.compile(r"[\"](.*?)[\"]", re.I), r""),         # Remove text within quotes
+    (re.compile(r" \'(.*?)\ '", re.I), r""),           # Remove text within quotes
+    (re.compile(r"\.+", re.I), r". "),                 # Remove ellipses
+    (re.compile(r"\(.*?\)", re.I), r""),               # Remove text within round brackets
+    (re.compile(r"&amp;", re.I), r"&"),                # Decode HTML entities
+]
+
+
+def normalize_text(text:str) -> str:
+    """Normalize the body of a Reddit message for natural language processing
+
+    Quote blocks, Markdown links, URLs, quoted and bracketed text, and overlong words
+        are removed, and the message is collapsed to a single line.
+
+    Keyword Arguments:
+        text {str} -- The body of the message
+
+    Returns:
+        str -- The normalized body
+    """
+    # Remove leading and trailing whitespace on each line
+    # Remove lines that begin with > indicating quote blocks
+    # Remove newlines (collapse to single line)
+    # This may also remove some lines that begin with spoilers. Could be fixed up.
+    text = " ".join([
+        line for line in text.strip().split("\n") if (
+            not line.strip().startswith("&gt;")
+        )
+    ])
+
+    for pattern, replacement in _normalization_substitutions:
+        text = pattern.sub(replacement, text)
+
+    # Remove words longer than the MAX_WORD_LENGTH
+    if len(text) > MAX_WORD_LENGTH:
+        text = " ".join(
+            [word for word in text.split(" ") if len(word) <= MAX_WORD_LENGTH]
+        )
+
+    return text
+
+
+def normalize_texts(texts:Iterable[str]) -> list[str]:
+    """Normalize the bodies of many Reddit messages
+
+    Keyword Arguments:
+        texts {Iterable[str]} -- The bodies of the messages
+
+    Returns:
+        list[str] -- The normalized bodies, in the order given
+    """
+    return [normalize_text(text) for text in texts]
 
 
 @dataclass
@@ -31,31 +106,61 @@ class UserComment:
 
 
 class Reddit:
-    def __init__(self, collector:Collector):
+    def __init__(self, collector:Collector, http:HttpClient|None=None):
         self.__debug_disable_tag:str = 'reddit'
         self.source_name:str = 'Reddit'
         self.collector:Collector = collector
+        self.http:HttpClient = http if http is not None else HttpClient()
+        self.rate_limiter:RateLimiter = RateLimiter(interval=0.5) # Helps prevent hyperactive rate limiting
+        self.__max_attempts:int = 3
+        self.__max_buffered_pages:int = 4 # Pages fetched ahead of residence extraction
         self.__base_headers:dict[str, str] = {
             'Accept': 'application/json',
             'User-Agent': __user_agent__,
         }
 
-        RM_SUBREDDIT_CSV_COLUMNS = [
-            'name',            # Subreddit name
-            'topic_level1',    # Level 1 topic. For instance, Entertainment.
-            'topic_level2',    # Level 2 topic. For instance, TV Shows.
-            'topic_level3',    # Level 2 topic. For instance, Sherlock.
-            'default',         # Y if default sub, blank otherwise.
-            'ignore_text',     # Y if text in sub needs to be ignored, blank otherwise.
-            'sub_attribute',   # An attribute we can derive from this subreddit. i.e. sex, religion, gadget, etc.
-            'sub_value',       # Value for the above attribute. i.e. male, atheism, iPhone, etc.
-        ]
-
-        self.RM_SUBREDDIT_DATA: pd.DataFrame = pd.read_csv(RM_SUBREDDIT_CSV_URL, names=RM_SUBREDDIT_CSV_COLUMNS)
+        self.__rm_subreddit_data:pd.DataFrame|None = None
+        self.__communities_to_ignore:frozenset[str]|None = None
+        self.__rm_subreddit_lock:threading.Lock = threading.Lock()
 
         self.nlp = NatLangProcessor()
 
 
+    @property
+    def RM_SUBREDDIT_DATA(self) -> pd.DataFrame:
+        """Subreddit metadata from redditmetis, loaded on first use
+
+        The CSV is cached on disk and revalidated with a conditional request when stale,
+            so neither startup nor repeat searches wait on GitHub. If it can be neither
+            fetched nor found on disk, an empty frame is used and loading is retried on the
+            next search.
+        """
+        self.__load_rm_subreddit_data()
+        return self.__rm_subreddit_data if self.__rm_subreddit_data is not None else pd.DataFrame(columns=RM_SUBREDDIT_CSV_COLUMNS)  # fmt: skip # noqa: E501
+
+
+    @property
+    def communities_to_ignore(self) -> frozenset[str]:
+        """Subreddits whose text is flagged by redditmetis as not worth analyzing"""
+        self.__load_rm_subreddit_data()
+        return self.__communities_to_ignore if self.__communities_to_ignore is not None else frozenset()
+
+
+    def __load_rm_subreddit_data(self) -> None:
+        with self.__rm_subreddit_lock:
+            if self.__rm_subreddit_data is not None:
+                return
+
+            try:
+                csv_path = fetch_cached(url=RM_SUBREDDIT_CSV_URL, filename='redditmetis_subreddits.csv', http=self.http)
+                data:pd.DataFrame = pd.read_csv(csv_path, names=RM_SUBREDDIT_CSV_COLUMNS)
+            except (FileNotFoundError, ValueError):
+                return
+
+            self.__communities_to_ignore = frozenset(data.loc[data['ignore_text'] == 'Y', 'name'])
+            self.__rm_subreddit_data = data
+
+
     @dataclass
     class __hints:
         """Dataclass to simplify data transfer between methods within the parent class
@@ -101,6 +206,22 @@ class Reddit:
         Returns:
             list[UserComment] -- A list of UserComment objects
         """
+        return [message for page in self.iter_message_pages(username=username, type=type) for message in page]
+
+
+    def iter_message_pages(self, username:str, type:str='comments') -> Iterator[list[UserComment]]:
+        """Fetch messages made by a given username one page at a time, in order of novelty
+
+        Each page is yielded as soon as it arrives, so callers may process it while the
+            next is fetched, without holding the full history in memory.
+
+        Keyword Arguments:
+            username {str} -- The username to fetch messages for
+            type {str} -- The type of message to fetch, comments or submitted (default: {'comments'})
+
+        Returns:
+            Iterator[list[UserComment]] -- Pages of up to 100 UserComment objects
+        """
         if type not in ['comments', 'submitted']:
             raise ValueError(f'Invalid type {type}')
 
@@ -108,18 +229,16 @@ class Reddit:
         if type == 'submitted':
             body_key = 'selftext'
 
-        communities_to_ignore: list[str] = \
-            self.RM_SUBREDDIT_DATA.loc[self.RM_SUBREDDIT_DATA['ignore_text'] == 'Y', 'name'].tolist()
+        communities_to_ignore:frozenset[str] = self.communities_to_ignore
 
         request_url_base: str = f'https://reddit.com/user/{username}/{type}.json?t=all&limit=100&sort=new'
         request_url: str = request_url_base
-        comments: list[UserComment] = []
 
         while True:
-            response = requests.get(url=request_url, headers=self.__base_headers, timeout=5)
+            response = self.__get(url=request_url)
 
             if response.status_code == 404:
-                return []
+                return
 
             if response.status_code == 429:
                 raise RequestError(rate_limit_exceeded=True)
@@ -129,83 +248,111 @@ class Reddit:
 
             response_json = response.json()
 
-            for child in response_json['data']['children']:
-                if child['data']['subreddit'] in communities_to_ignore:
-                    continue
-
-                new_comment: UserComment = UserComment(
-                    url=f'https://old.reddit.com{child['data']['permalink']}',
-                    body=child['data'][body_key],
-                    normalized_body=self.__normalize_text(text=child['data'][body_key]),
-                    subreddit=child['data']['subreddit'],
+            children:list[dict] = [
+                child['data'] for child in response_json['data']['children']
+                if child['data']['subreddit'] not in communities_to_ignore
+            ]
+            normalized_bodies:list[str] = normalize_texts(child[body_key] for child in children)
+
+            yield [
+                UserComment(
+                    url=f'https://old.reddit.com{child["permalink"]}',
+                    body=child[body_key],
+                    normalized_body=normalized_body,
+                    subreddit=child['subreddit'],
                 )
-
-                comments.append(new_comment)
+                for child, normalized_body in zip(children, normalized_bodies)
+            ]
 
             if 'after' in response_json['data'] and response_json['data']['after'] is not None:
                 request_url = f'{request_url_base}&after={response_json["data"]["after"]}'
             else:
-                return comments
-
-            time.sleep(0.5) # Helps prevent hyperactive rate limiting
-
-
-    def __normalize_text(self, text:str) -> str:
-        MAX_WORD_LENGTH = 255
-
-        # Remove leading and trailing whitespace on each line
-        # Remove lines that begin with > indicating quote blocks
-        # Remove newlines (collapse to single line)
-        # This may also remove some lines that begin with spoilers. Could be fixed up.
-        text = " ".join([
-            line for line in text.strip().split("\n") if (
-                not line.strip().startswith("&gt;")
-            )
-        ])
-
-        substitutions = [
-            (r"\[(.*?)\]\((.*?)\)", r""),     # Remove links from Markdown
-            (r"[\"](.*?)[\"]", r""),          # Remove text within quotes
-            (r" \'(.*?)\ '", r""),            # Remove text within quotes
-            (r"\.+", r". "),                  # Remove ellipses
-            (r"\(.*?\)", r""),                # Remove text within round brackets
-            (r"&amp;", r"&"),                 # Decode HTML entities
-            (r"http.?:\S+\b", r" ")           # Remove URLs
-        ]
-        for pattern, replacement in substitutions:
-            _text = re.sub(pattern, replacement, text, flags=re.I)
-
-        # Remove words longer than the MAX_WORD_LENGTH
-        text = " ".join(
-            [word for word in _text.split(" ") if len(word) <= MAX_WORD_LENGTH]
-        )
+                return
 
-        return text
 
+    def __stream_message_pages(self, username:str) -> Iterator[list[UserComment]]:
+        """Fetch comments and submissions concurrently, yielding pages of either as they arrive
 
-    def search_for_interesting_hints(self, search_args:SearchArgs) -> __hints:
-        # Retrieve comments and submissions
-        comments: list[UserComment] = self.fetch_messages_by_username(username=search_args.query, type='comments')
-        submissions: list[UserComment] = self.fetch_messages_by_username(username=search_args.query, type='submitted')
+        Pages are passed through a bounded queue, so fetching runs at most a few pages
+            ahead of the consumer. Errors raised while fetching are raised to the consumer.
+
+        Keyword Arguments:
+            username {str} -- The username to fetch messages for
 
+        Returns:
+            Iterator[list[UserComment]] -- Pages of UserComment objects
+        """
+        message_types:list[str] = ['comments', 'submitted']
+        pages:queue.Queue = queue.Queue(maxsize=self.__max_buffered_pages)
+        stopped:threading.Event = threading.Event()
+
+        def put(item:list[UserComment]|Exception|None) -> bool:
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(type:str) -> None:
+            try:
+                for page in self.iter_message_pages(username=username, type=type):
+                    if not put(page):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(None) # One sentinel per producer, marking it finished
+
+        with ThreadPoolExecutor(max_workers=len(message_types)) as executor:
+            for type in message_types:
+                executor.submit(produce, type)
+            try:
+                finished = 0
+                while finished < len(message_types):
+                    item = pages.get()
+                    if item is None:
+                        finished += 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stopped.set() # Release producers blocked on a full queue if the consumer stops early
+
+
+    def __get(self, url:str) -> requests.Response:
+        """Get a given URL, paced by and waiting out Reddit's rate limits"""
+        for _ in range(self.__max_attempts):
+            self.rate_limiter.acquire()
+            response = self.http.get(url=url, headers=self.__base_headers, timeout=5)
+            if not self.rate_limiter.update(response.status_code, response.headers):
+                break
+        return response
+
+
+    def search_for_interesting_hints(self, search_args:SearchArgs) -> __hints:
         hints: self.__hints = self.__hints()  # type: ignore[name-defined] # TODO: Figure out why this is even flagged
 
-        for comment in comments + submissions:
-            discovered_locations: list[str] = self.nlp.get_residences(comment.normalized_body)
+        # Residences are extracted from each page of comments or submissions while the next pages are fetched
+        for messages in self.__stream_message_pages(username=search_args.query):
+            residences: list[list[str]] = self.nlp.get_residences_many(message.normalized_body for message in messages)
 
-            for location in discovered_locations:
-                hints.locations.append({
-                    'location': location,
-                    'content_url': comment.url,
-                    'comment': comment.body,
-                })
+            for comment, discovered_locations in zip(messages, residences):
+                for location in discovered_locations:
+                    hints.locations.append({
+                        'location': location,
+                        'content_url': comment.url,
+                        'comment': comment.body,
+                    })
 
         return hints  # type: ignore[no-any-return] # False positive?
 
 
     def __check_if_exists(self, username:str) -> bool:
         request_url: str = f'https://reddit.com/user/{username}/comments.json?sort=new&limit=1'
-        response = requests.get(url=request_url, headers=self.__base_headers, timeout=5)
+        response = self.__get(url=request_url)
         if response.status_code == 404:
             return False
         return True
@@ -217,7 +364,7 @@ class Reddit:
 
         new_data: list[dict[str, str|bool]] = []
 
-        if compare_to_known(query=search_args.query, id=ref_list['ref_a']):
+        if compare_to_known(query=search_args.query, id=ref_list['ref_a'], http=self.http):
             return pd.DataFrame()
 
         hints: self.__hints = self.search_for_interesting_hints(search_args=search_args)  # type: ignore[name-defined] # TODO: Figure out why this is even flagged
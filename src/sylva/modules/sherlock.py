@@ -1,5 +1,6 @@
 
 import re
+import threading
 from typing import Dict, List
 
 import pandas as pd
@@ -12,22 +13,65 @@ from sherlock_project.sherlock import (  # type: ignore[import-untyped]
 
 from .. import __url_normalization_pattern__
 from ..collector import Collector
+from ..config import config
 from ..errors import RequestError
 from ..helpers import pattern_match
+from ..helpers.http_client import HttpClient
+from ..helpers.remote_cache import fetch_cached
 from ..types import QueryType, SearchArgs
 
+try:
+    from sherlock_project.sites import MANIFEST_URL  # type: ignore[import-untyped]
+except ImportError: # Older releases of sherlock-project load the manifest directly from GitHub
+    MANIFEST_URL = 'https://raw.githubusercontent.com/sherlock-project/sherlock/master/sherlock_project/resources/data.json'
+
 
 class Sherlock:
-    def __init__(self, collector:Collector):
+    def __init__(self, collector:Collector, http:HttpClient|None=None):
         """Initialize the Sherlock module
 
         Keyword Arguments:
             collector {Collector} -- The collector callback to use for results
+            http {HttpClient} -- Shared HTTP client for follow-up requests (default: {new client})
         """
         self.__debug_disable_tag:str = 'sherlock'
         self.source_name:str = 'Sherlock'
         self.collector:Collector = collector
-        self.pattern_match = pattern_match.PatternMatch()
+        self.http:HttpClient = http if http is not None else HttpClient()
+        self.pattern_match = pattern_match.PatternMatch(http=self.http)
+        self.__sites_data:Dict[str, Dict]|None = None
+        self.__sites_lock:threading.Lock = threading.Lock()
+
+
+    def __load_sites(self) -> Dict[str, Dict]:
+        """Load the Sherlock site manifest, once per instance
+
+        The manifest is cached on disk and revalidated with a conditional request when
+            stale. If `[Target Options] sherlock-sites` is set, only the listed sites
+            are retained.
+
+        Returns:
+            Dict[str, Dict] -- Site information keyed by site name
+        """
+        with self.__sites_lock:
+            if self.__sites_data is not None:
+                return self.__sites_data
+
+            try:
+                sites = SitesInformation(
+                    data_file_path=fetch_cached(url=MANIFEST_URL, filename='sherlock_data.json', http=self.http),
+                )
+            except (FileNotFoundError, ValueError) as e:
+                raise RequestError(f'Failed to get results from Sherlock: {e}')
+
+            site_subset:set[str] = {
+                site.strip().lower() for site in config['Target Options']['sherlock-sites'].split(',') if site.strip()
+            }
+            self.__sites_data = {
+                site.name: site.information for site in sites
+                if not site_subset or site.name.lower() in site_subset
+            }
+            return self.__sites_data
 
     def accepts(self, search_args:SearchArgs) -> bool:
         """Determine if the search is supported by the module
@@ -55,80 +99,71 @@ class Sherlock:
         Returns:
             pd.DataFrame -- The results of the search
         """
-        try:
-            sites = SitesInformation()
-        except FileNotFoundError as e:
-            raise RequestError(f'Failed to get results from Sherlock: {e}')
-        sites_data = { site.name: site.information for site in sites }
-        results:List[Dict] = sherlock(
+        # Sherlock stores request state in each site's information, so concurrent searches each need a copy
+        sites_data = { name: dict(information) for name, information in self.__load_sites().items() }
+        results:Dict[str, Dict] = sherlock(
             username=search_args.query,
             site_data=sites_data,
             query_notify=QueryNotify(),
             timeout=timeout,
         )
 
-        exists:List[Dict] = []
-        matched_patterns = pd.DataFrame()
-        for site in sites:
-            if results[site.name]['status'].status == QueryStatus.CLAIMED:
+        claimed:List[Dict] = []
+        pattern_match_args_list:List[pattern_match.PatternMatchQueryArgs] = []
+        preexisting:pd.DataFrame = self.collector.get_data()
+        for site_name in sites_data:
+            if results[site_name]['status'].status == QueryStatus.CLAIMED:
                 new_item:Dict = {
                     'query': search_args.query,
                     'source_name': self.source_name,
                     'branch_recommended': True,
-                    'platform_name': site.name,
-                    'platform_url': re.sub(__url_normalization_pattern__, '', results[site.name]['url_user']),
+                    'platform_name': site_name,
+                    'platform_url': re.sub(__url_normalization_pattern__, '', results[site_name]['url_user']),
                     'username': search_args.query,
                 }
 
                 send_body:bool = True
                 if (
-                    'urlProbe' in sites_data[site.name]
-                    or sites_data[site.name]['errorType'] != 'message'
+                    'urlProbe' in sites_data[site_name]
+                    or sites_data[site_name]['errorType'] != 'message'
                     or (
-                        'request_method' in sites_data[site.name]
-                        and sites_data[site.name]['request_method'] != 'GET'
+                        'request_method' in sites_data[site_name]
+                        and sites_data[site_name]['request_method'] != 'GET'
                     )
                 ):
                     send_body = False
 
                 try:
-                    body_placeholder = results[site.name]['response_text'].decode('utf-8')
+                    body_placeholder = results[site_name]['response_text'].decode('utf-8')
                 except UnicodeDecodeError:
                     body_placeholder = None
                     send_body = False
 
-                pattern_match_args: pattern_match.PatternMatchQueryArgs = pattern_match.PatternMatchQueryArgs(
-                    url=sites_data[site.name]['url'],
+                claimed.append(new_item)
+                pattern_match_args_list.append(pattern_match.PatternMatchQueryArgs(
+                    url=sites_data[site_name]['url'],
                     body=body_placeholder if send_body else None,
                     query=search_args.query,
-                    preexisting=self.collector.get_data(),
-                )
-
-                try:
-                    newly_matched_patterns_df: pd.DataFrame = self.pattern_match.search(pattern_match_args)
-                except RequestError:
-                    newly_matched_patterns_df = pd.DataFrame()
-                else:
-                    if not newly_matched_patterns_df.empty:
-                        newly_matched_patterns_df['query'] = search_args.query
-                        newly_matched_patterns_df['branch_recommended'] = True
-
-
-                matched_patterns = pd.concat(
-                    [matched_patterns, newly_matched_patterns_df],
-                    ignore_index=True,
-                )
-
-                if (
-                    matched_patterns.empty
-                    or new_item['platform_url'] not in matched_patterns['platform_url'].values
-                ):
-                    exists.append(new_item)
+                    preexisting=preexisting,
+                ))
+
+        # Follow-up fetches for all claimed sites are batched once the sweep completes, rather than made serially
+        matched_patterns:List[pd.DataFrame] = []
+        matched_urls:set = set()
+        for newly_matched_patterns_df in self.pattern_match.search_many(pattern_match_args_list):
+            if not newly_matched_patterns_df.empty:
+                newly_matched_patterns_df['query'] = search_args.query
+                newly_matched_patterns_df['branch_recommended'] = True
+                matched_patterns.append(newly_matched_patterns_df)
+                if 'platform_url' in newly_matched_patterns_df:
+                    matched_urls.update(newly_matched_patterns_df['platform_url'].dropna())
+
+        exists:List[Dict] = [new_item for new_item in claimed if new_item['platform_url'] not in matched_urls]
 
         new_data = pd.DataFrame(exists)
 
-        if not matched_patterns.empty:
-            new_data = pd.concat([new_data, matched_patterns], ignore_index=True)
+        if matched_patterns:
+            new_data = pd.concat([new_data, *matched_patterns], ignore_index=True)
 
         self.collector.insert(new_data)
         return new_data
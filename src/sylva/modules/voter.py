@@ -1,24 +1,31 @@
-from typing import Dict
+from contextlib import AbstractContextManager, nullcontext
+from typing import Dict, List
 
 import pandas as pd
 
 from .. import Collector
 from ..helpers.generic import compare_to_known, ref_list
-from ..helpers.proxy import test_if_flaresolverr_online
+from ..helpers.http_client import HttpClient
+from ..helpers.proxy import ProxySvc, test_if_flaresolverr_online
 from ..modules.voter_regions import USA
 from ..types import QueryType, SearchArgs
 
 
 class Voter:
-    def __init__(self, collector:Collector):
+    def __init__(self, collector:Collector, http:HttpClient|None=None, proxy:ProxySvc|None=None):
         """Initialize the Voter module
 
         Keyword Arguments:
             collector {Collector} -- The collector callback to use for results
+            http {HttpClient} -- Shared HTTP client for proxy requests (default: {new client})
+            proxy {ProxySvc} -- Proxy service whose session pool lookups are spread across (default: {None})
         """
         self.__debug_disable_tag:str = 'voter'
         self.source_name:str = 'Voter Registry'
+        self.requires_proxy:bool = True
         self.collector:Collector = collector
+        self.http:HttpClient = http if http is not None else HttpClient()
+        self.proxy:ProxySvc|None = proxy
 
 
     def accepts(self, search_args:SearchArgs) -> bool:
@@ -57,22 +64,43 @@ class Voter:
         ):
             return pd.DataFrame()
 
-        if not test_if_flaresolverr_online(proxy_url=search_args.proxy_data['proxy_url']):
+        if self.proxy is not None:
+            if not self.proxy.is_healthy:
+                return pd.DataFrame()
+        elif not test_if_flaresolverr_online(proxy_url=search_args.proxy_data['proxy_url']):
             return pd.DataFrame()
 
-        if compare_to_known(query=search_args.query, id=ref_list['ref_a']):
+        if compare_to_known(query=search_args.query, id=ref_list['ref_a'], http=self.http):
             return pd.DataFrame()
 
-        new_data:Dict[str, str|bool] = USA.search(full_name=search_args.query, proxy_data=search_args.proxy_data)
+        session:AbstractContextManager[str|None] = nullcontext(search_args.proxy_data.get('flaresolverr_session_id'))
+        if self.proxy is not None:
+            session = self.proxy.session()
 
-        if new_data is None or new_data == {}:
-            return pd.DataFrame()
+        with session as session_id:
+            records:List[USA.VoterRecord] = USA.search(
+                full_name=search_args.query,
+                proxy_data={**search_args.proxy_data, 'flaresolverr_session_id': session_id},  # type: ignore[dict-item]
+                http=self.http,
+            )
 
-        new_data['query'] = search_args.query
-        new_data['source_name'] = self.source_name
+        if not records:
+            return pd.DataFrame()
 
-        new_df:pd.DataFrame = pd.DataFrame([new_data])
+        new_data:List[Dict[str, str|int|bool|None]] = []
+        for record in records:
+            new_data.append({
+                'query': search_args.query,
+                'source_name': self.source_name,
+                'branch_recommended': len(records) == 1, # More than one match is low confidence
+                'platform_name': 'VoterRecords.com',
+                'platform_url': record.profile_url,
+                'full_name': record.full_name,
+                'raw_address': record.raw_address,
+                'age': record.age,
+            })
+
+        new_df:pd.DataFrame = pd.DataFrame(new_data)
         self.collector.insert(new_df)
 
         return new_df
-
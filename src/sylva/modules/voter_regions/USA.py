@@ -1,9 +1,11 @@
 import re
 import urllib.parse
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List
 
-import requests
+from ...errors import RequestError
+from ...helpers.http_client import HttpClient
 
 __us_state_to_abbrev:Dict[str, str] = {
     "alaska": "ak",
@@ -36,6 +38,64 @@ __base_proxy_headers:Dict[str, str] = {
 
 __voter_data_url:str = 'https://voterrecords.com'
 
+# Each result row opens with the profile link, as below, and the remaining fields follow within the row
+# <tr data-href="/voter/<id number>/<name>" itemscope itemtype="http://schema.org/Person">
+__row_pattern:re.Pattern = re.compile(r'tr data-href="(?P<URL_PART>\/voter\/\d+\/[a-z\-]+)\" itemscope')
+__fullname_pattern:re.Pattern = re.compile(r'span itemprop="name">(?P<FULLNAME>.+?) ?<\/span>')
+__rawaddr_pattern:re.Pattern = re.compile(r'span itemprop="address">(?P<ADDRESS>.+?)<\/span>')
+__age_pattern:re.Pattern = re.compile(r'<strong>Age:&nbsp;<\/strong>(?P<AGE>\d{1,3})<br\/>')
+
+
+@dataclass
+class VoterRecord:
+    """Dataclass to store a single voter found in a search
+
+    Attributes:
+        profile_url (str): The URL of the voter's profile
+        full_name (str): The full name of the voter
+        raw_address (str): The address of the voter, as shown
+        age (int|None): The age of the voter, if not redacted
+    """
+    profile_url: str
+    full_name: str
+    raw_address: str
+    age: int|None = None
+
+
+def extract_voter_records(page:str) -> List[VoterRecord]:
+    """Extract every voter listed in a page of search results
+
+    The page is split into rows at each profile link, and each row is searched only for
+        its own fields. Rows missing a name or address (redacted or excluded) are skipped.
+
+    Keyword Arguments:
+        page {str} -- The HTML of the search results page
+
+    Returns:
+        List[VoterRecord] -- The voters found, in the order listed
+    """
+    rows = list(__row_pattern.finditer(page))
+    records:List[VoterRecord] = []
+
+    for i, row in enumerate(rows):
+        row_end = rows[i + 1].start() if i + 1 < len(rows) else len(page)
+        fullname = __fullname_pattern.search(page, row.end(), row_end)
+        rawaddr = __rawaddr_pattern.search(page, row.end(), row_end)
+        age = __age_pattern.search(page, row.end(), row_end)
+        if fullname is None or rawaddr is None:
+            continue
+
+        # TODO First name, middle initial, and last name can be guessed based on values on the profile's page
+        # (compare with/without middle initial)
+        records.append(VoterRecord(
+            profile_url=f'{__voter_data_url}{row.group("URL_PART")}',
+            full_name=fullname.group('FULLNAME'),
+            raw_address=rawaddr.group('ADDRESS'),
+            age=int(age.group('AGE')) if age is not None else None,
+        ))
+
+    return records
+
 def search(
         proxy_data:dict[str, str],
         first_name:str|None=None,
@@ -45,7 +105,8 @@ def search(
         state:str|None=None,
         city:str|None=None,
         age:int|None=None,
-) -> Dict[str, str|bool]:
+        http:HttpClient|None=None,
+) -> List[VoterRecord]:
     """Search for voter information in the United States
 
     Keyword Arguments:
@@ -56,12 +117,13 @@ def search(
         state {str} -- The state of the voter (default: {None})
         city {str} -- The city of the voter (default: {None})
         age {int} -- The age of the voter (default: {None})
+        http {HttpClient} -- Shared HTTP client to reach the proxy with (default: {new client})
 
     Note that at least one name related argument MUST be provided.
     State should be full proper name or two letter abbreviation.
 
     Returns:
-        pd.DataFrame -- A DataFrame containing the results of the search
+        List[VoterRecord] -- Every voter listed in the first page of results
     """
     if (
         first_name is None
@@ -69,7 +131,7 @@ def search(
         and last_name is None
         and full_name is None
     ):
-        return {}
+        return []
 
     if (
         (
@@ -153,46 +215,23 @@ def search(
         'maxTimeout': 30000,
     }
 
-    response = requests.post(url=proxy_data["proxy_url"], json=request_data, headers=__base_proxy_headers)
+    # FlareSolverr holds the request open for up to maxTimeout, so the default timeout is too short
+    response = (http if http is not None else HttpClient()).post(
+        url=proxy_data["proxy_url"],
+        json=request_data,
+        headers=__base_proxy_headers,
+        timeout=request_data['maxTimeout'] / 1000 + 10,
+    )
 
     if response.status_code != 200:
-        # FlareSolverr proxy failed directly
-        return {}
+        # FlareSolverr proxy failed directly, so the session is raised out of use
+        raise RequestError(message=f'FlareSolverr failed with response code {response.status_code}')
 
-    if response.json()['solution']['status'] != 200:
-        # FlareSolverr proxy failed to get a valid response from target
-        return {}
-
-    # Matching expected indicator or new rows (shown below). More than one is low confidence.
-    # <tr data-href="/voter/<id number>/<name>" itemscope itemtype="http://schema.org/Person">
-    if response.text.count('tr data-href') != 1:
-        return {}
+    # The payload embeds the full page, so it is decoded only once
+    solution:Dict = response.json().get('solution') or {}
 
-    urlpart_pattern = r'tr data-href="(?P<URL_PART>\/voter\/\d+\/[a-z\-]+)\" itemscope'
-    fullname_pattern = r'span itemprop="name">(?P<FULLNAME>.+?) ?<\/span>'
-    rawaddr_pattern = r'span itemprop="address">(?P<ADDRESS>.+?)<\/span>'
-    age_pattern = r'<strong>Age:&nbsp;<\/strong>(?P<AGE>\d{1,3})<br\/>'
+    if solution.get('status') != 200:
+        # FlareSolverr proxy failed to get a valid response from target
+        return []
 
-    try:
-        # TODO First name, middle initial, and last name can be guessed based on values on the profile's page
-        # (compare with/without middle initial)
-        urlpart: str = re.search(urlpart_pattern, response.json()['solution']['response']).group('URL_PART')  # type: ignore[union-attr]
-        profile_url: str = f'{__voter_data_url}{urlpart}'
-        fullname: str = re.search(fullname_pattern, response.json()['solution']['response']).group('FULLNAME')  # type: ignore[union-attr]
-        rawaddr: str = re.search(rawaddr_pattern, response.json()['solution']['response']).group('ADDRESS')  # type: ignore[union-attr]
-        age = int(re.search(age_pattern, response.json()['solution']['response']).group('AGE'))  # type: ignore[union-attr]
-    except KeyError:
-        # Important expected data not found. Possibly a false positive.
-        # TODO Make this better for handling redacted/excluded data
-        return {}
-
-    new_data:Dict = {
-            'branch_recommended': True,
-            'platform_name': "VoterRecords.com",
-            'platform_url': profile_url,
-            'full_name': fullname,
-            'raw_address': rawaddr,
-            'age': age,
-        }
-
-    return new_data
+    return extract_voter_records(solution.get('response') or '')
@@ -1,9 +1,16 @@
 from dataclasses import dataclass
 from enum import Enum
+from operator import itemgetter
+from typing import Any
 
 import pandas as pd
 
 
+def is_missing(value:Any) -> bool:
+    """Whether a result value is absent, whether as None or a pandas missing value (NaN, NaT, NA)"""
+    return value is None or (pd.api.types.is_scalar(value) and bool(pd.isna(value)))
+
+
 class QueryType(Enum):
     """Used to more consistently define the type of a query"""
     TEXT = 'Simple'
@@ -37,53 +44,112 @@ class ResultDataFrame:
     This object should rarely be interacted with directly, but the structure is
         valuable knowledge to have as returned DataFrames will be of this type.
 
+    Rows are buffered as they are inserted and only materialized into a DataFrame
+        when requested. The materialized DataFrame is cached until the next insert,
+        at which point only the newly inserted rows are converted and appended.
+
+    Rows are deduplicated as they are inserted by fingerprinting their non-missing
+        values. Duplicate rows are kept aside rather than discarded, and can be
+        retrieved with get_data(include_duplicates=True).
+
     Attributes:
-        data (pd.DataFrame): The internal DataFrame object
+        data (pd.DataFrame): The materialized DataFrame object
+        ignored_columns (set[str]): Columns disregarded when identifying duplicate rows
 
     Methods:
         insert_frame: Insert a new DataFrame into the collector
         get_data: Returns a Pandas DataFrame of the collected results
         deduplicate: Deduplicate the collected results
     """
-    def __init__(self) -> None:
-        self.data: pd.DataFrame = pd.DataFrame(
-            columns=[
-                'query',
-                'source_name',
-                'branch_recommended',
-                'platform_name',
-                'platform_url',
-                'username',
-                'email',
-                'phone',
-                'password',
-                'age',
-                'sex',
-                'first_name',
-                'middle_name',
-                'last_name',
-                'full_name',
-                'birth_year',
-                'birth_month',
-                'birth_day',
-                'street',
-                'unit',
-                'city',
-                'region',
-                'postal_code',
-                'country',
-                'raw_address',
-                'comment',
-                ]
-        )
+    def __init__(self, ignored_columns:list[str]|None=None) -> None:
+        self.__columns: list[str] = [
+            'query',
+            'source_name',
+            'branch_recommended',
+            'platform_name',
+            'platform_url',
+            'username',
+            'email',
+            'phone',
+            'password',
+            'age',
+            'sex',
+            'first_name',
+            'middle_name',
+            'last_name',
+            'full_name',
+            'birth_year',
+            'birth_month',
+            'birth_day',
+            'street',
+            'unit',
+            'city',
+            'region',
+            'postal_code',
+            'country',
+            'raw_address',
+            'comment',
+            ]
+        self.ignored_columns: set[str] = set(ignored_columns or [])
+        self.__rows: list[dict] = []
+        self.__duplicates: list[dict] = []
+        self.__fingerprints: set = set()
+        self.__materialized: pd.DataFrame = pd.DataFrame(columns=self.__columns)
+        self.__materialized_rows: int = 0
+        self.__materialized_columns: int = len(self.__columns)
         pd.set_option('display.max_rows', None)
     def __str__(self) -> str:
-        return self.data.__str__()
-    def insert_frame(self, new_data:pd.DataFrame) -> pd.DataFrame:
-        self.data = pd.concat([self.data, new_data], ignore_index=True)
-        return self.data
-    def get_data(self) -> pd.DataFrame:
-        return self.data
+        return self.get_data().__str__()
+    @property
+    def data(self) -> pd.DataFrame:
+        return self.get_data()
+    def __fingerprint(self, row:dict) -> Any:
+        fingerprint: Any = tuple(sorted(
+            ((column, value) for column, value in row.items()
+                if column not in self.ignored_columns and not is_missing(value)),
+            key=itemgetter(0),
+        ))
+        try:
+            hash(fingerprint)
+        except TypeError:
+            fingerprint = repr(fingerprint)
+        return fingerprint
+    def insert_frame(self, new_data:pd.DataFrame) -> list[dict]:
+        """Buffer the rows of a new DataFrame, setting aside any duplicates
+
+        Returns:
+            list[dict] -- The inserted rows, excluding duplicates
+        """
+        for column in new_data.columns:
+            if column not in self.__columns:
+                self.__columns.append(column)
+        new_rows: list[dict] = []
+        for row in new_data.to_dict(orient='records'):
+            fingerprint = self.__fingerprint(row)
+            if fingerprint in self.__fingerprints:
+                self.__duplicates.append(row)
+                continue
+            self.__fingerprints.add(fingerprint)
+            new_rows.append(row)
+        self.__rows.extend(new_rows)
+        return new_rows
+    def get_data(self, include_duplicates:bool=False) -> pd.DataFrame:
+        if self.__materialized_columns != len(self.__columns):
+            self.__materialized = self.__materialized.reindex(columns=self.__columns)
+            self.__materialized_columns = len(self.__columns)
+        if self.__materialized_rows < len(self.__rows):
+            pending = pd.DataFrame.from_records(self.__rows[self.__materialized_rows:], columns=self.__columns)
+            if self.__materialized_rows == 0:
+                self.__materialized = pending
+            else:
+                self.__materialized = pd.concat([self.__materialized, pending], ignore_index=True)
+            self.__materialized_rows = len(self.__rows)
+        if include_duplicates and self.__duplicates:
+            return pd.concat(
+                [self.__materialized, pd.DataFrame.from_records(self.__duplicates, columns=self.__columns)],
+                ignore_index=True,
+            )
+        return self.__materialized
     def deduplicate(self) -> pd.DataFrame:
-        self.data = self.data.drop_duplicates()
-        return self.data
+        """Retained for compatibility, as rows are deduplicated on insertion"""
+        return self.get_data()
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from sylva.cache import Cache
+from sylva.types import QueryType
+
+
+@pytest.fixture
+def cache(tmp_path) -> Cache:  # type: ignore[no-untyped-def]
+    return Cache(cache_db_path=str(tmp_path / 'cache.sqlite'), enabled=True, ttl=60, max_entries=2)
+
+
+def _frame(username: str) -> pd.DataFrame:
+    return pd.DataFrame([{'query': username, 'username': username, 'branch_recommended': True}])
+
+
+def test_round_trip(cache: Cache) -> None:
+    """Cached results are returned intact"""
+    cache.set('Sherlock', QueryType.USERNAME, 'user123', _frame('user123'))
+    cached = cache.get('Sherlock', QueryType.USERNAME, 'user123')
+    assert cached is not None
+    assert cached.to_dict(orient='records') == [{'query': 'user123', 'username': 'user123', 'branch_recommended': True}]
+
+
+def test_key_includes_source_and_type(cache: Cache) -> None:
+    """Results are not shared between sources or query types"""
+    cache.set('Sherlock', QueryType.USERNAME, 'user123', _frame('user123'))
+    assert cache.get('GitHub', QueryType.USERNAME, 'user123') is None
+    assert cache.get('Sherlock', QueryType.EMAIL, 'user123') is None
+
+
+def test_query_normalization(cache: Cache) -> None:
+    """Queries differing only in case or whitespace share an entry"""
+    cache.set('GitHub', QueryType.FULLNAME, 'John  Doe ', _frame('jdoe'))
+    assert cache.get('GitHub', QueryType.FULLNAME, 'john doe') is not None
+
+
+def test_ttl_expiry(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Expired results are not returned"""
+    cache = Cache(cache_db_path=str(tmp_path / 'cache.sqlite'), enabled=True, ttl=-1, max_entries=10)
+    cache.set('Sherlock', QueryType.USERNAME, 'user123', _frame('user123'))
+    assert cache.get('Sherlock', QueryType.USERNAME, 'user123') is None
+
+
+def test_eviction_of_least_recently_accessed(cache: Cache) -> None:
+    """Entries beyond max_entries are evicted, least recently accessed first"""
+    cache.set('Sherlock', QueryType.USERNAME, 'a', _frame('a'))
+    cache.set('Sherlock', QueryType.USERNAME, 'b', _frame('b'))
+    cache.get('Sherlock', QueryType.USERNAME, 'a')
+    cache.set('Sherlock', QueryType.USERNAME, 'c', _frame('c'))
+    assert cache.get('Sherlock', QueryType.USERNAME, 'a') is not None
+    assert cache.get('Sherlock', QueryType.USERNAME, 'b') is None
+    assert cache.get('Sherlock', QueryType.USERNAME, 'c') is not None
+
+
+def test_empty_results_not_cached(cache: Cache) -> None:
+    """Empty results may indicate transient failure and are not cached"""
+    cache.set('Reddit', QueryType.USERNAME, 'user123', pd.DataFrame())
+    assert cache.get('Reddit', QueryType.USERNAME, 'user123') is None
+
+
+def test_refresh_and_disabled(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Refresh skips reads but still writes, and a disabled cache does neither"""
+    path = str(tmp_path / 'cache.sqlite')
+    Cache(cache_db_path=path, enabled=True, refresh=True, ttl=60, max_entries=10).set(
+        'Sherlock', QueryType.USERNAME, 'user123', _frame('user123'),
+    )
+    assert Cache(cache_db_path=path, enabled=True, refresh=True, ttl=60, max_entries=10).get(
+        'Sherlock', QueryType.USERNAME, 'user123',
+    ) is None
+    assert Cache(cache_db_path=path, enabled=True, ttl=60, max_entries=10).get(
+        'Sherlock', QueryType.USERNAME, 'user123',
+    ) is not None
+
+    disabled = Cache(cache_db_path=path, enabled=False, ttl=60, max_entries=10)
+    assert disabled.get('Sherlock', QueryType.USERNAME, 'user123') is None
+
+
+def test_key_includes_recursion(cache: Cache) -> None:
+    """Results found at the top level are not reused for branched-in queries, and vice versa"""
+    cache.set('Endato', QueryType.FULLNAME, 'john doe', _frame('jdoe'))
+    assert cache.get('Endato', QueryType.FULLNAME, 'john doe', in_recursion=True) is None
+    assert cache.get('Endato', QueryType.FULLNAME, 'john doe', in_recursion=False) is not None
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from sylva import Collector
+
+
+def test_unique_values_indexed_once() -> None:
+    """Values repeated across inserts are indexed only once, in order of discovery"""
+    collector = Collector()
+    collector.insert(pd.DataFrame([{'query': 'a', 'username': 'user123', 'first_name': 'John', 'last_name': 'Doe'}]))
+    collector.insert(pd.DataFrame([
+        {'query': 'a', 'username': 'user456', 'first_name': 'John', 'last_name': 'Doe'},
+        {'query': 'b', 'username': 'user123'},
+    ]))
+    assert collector.get_unique_queries() == ['a', 'b']
+    assert collector.get_unique_usernames() == ['user123', 'user456']
+    assert collector.get_unique_fullname_groups() == {('John', None, 'Doe')}
+
+
+def test_unique_branchables() -> None:
+    """Only branchable values are returned when requested"""
+    collector = Collector()
+    collector.insert(pd.DataFrame([
+        {'query': 'a', 'username': 'user123', 'branch_recommended': True},
+        {'query': 'a', 'username': 'user456', 'branch_recommended': False},
+        {'query': 'a', 'email': np.nan, 'branch_recommended': True},
+    ]))
+    assert collector.get_unique_usernames() == ['user123', 'user456']
+    assert collector.get_unique_usernames(branchable_only=True) == ['user123']
+    assert collector.get_unique_emails(branchable_only=True) == []
+
+
+def test_checkpoint_advances() -> None:
+    """Checkpoints move forward only as new branchable values are discovered"""
+    collector = Collector()
+    first = collector.checkpoint()
+    collector.insert(pd.DataFrame([{'query': 'a', 'username': 'user123', 'branch_recommended': True}]))
+    second = collector.checkpoint()
+    collector.insert(pd.DataFrame([{'query': 'a', 'username': 'user123', 'branch_recommended': True}]))
+    assert first['username'] == 0
+    assert second['username'] == 1
+    assert collector.checkpoint() == second
+
+
+def test_new_branchables_since_checkpoint() -> None:
+    """Only values discovered after a checkpoint are returned for it"""
+    collector = Collector()
+    collector.insert(pd.DataFrame([{'query': 'a', 'username': 'user123', 'branch_recommended': True}]))
+    checkpoint = collector.checkpoint()
+    collector.insert(pd.DataFrame([
+        {'query': 'b', 'username': 'user123', 'branch_recommended': True},
+        {'query': 'b', 'username': 'user456', 'branch_recommended': True},
+    ]))
+    assert collector.get_new_branchables(checkpoint)['username'] == ['user456']
+    assert collector.get_new_branchables()['username'] == ['user123', 'user456']
+    assert collector.get_new_branchables(collector.checkpoint())['username'] == []
+
+
+def test_duplicates_rejected_on_insert() -> None:
+    """Duplicate rows are set aside as they are inserted"""
+    collector = Collector()
+    collector.insert(pd.DataFrame([{'query': 'a', 'username': 'user123'}]))
+    collector.insert(pd.DataFrame([{'query': 'a', 'username': 'user123', 'email': np.nan}]))
+    assert len(collector.get_data().index) == 1
+    assert len(collector.get_data(include_duplicates=True).index) == 2
+
+
+def test_deduplication_ignored_columns() -> None:
+    """Ignored columns are disregarded when identifying duplicates"""
+    collector = Collector(deduplication_ignored_columns=['comment'])
+    collector.insert(pd.DataFrame([
+        {'query': 'a', 'raw_address': 'Boston', 'comment': 'I live in Boston'},
+        {'query': 'a', 'raw_address': 'Boston', 'comment': 'Still in Boston'},
+    ]))
+    assert len(collector.get_data().index) == 1
+
+
+def test_include_duplicates_by_default() -> None:
+    """Setting include_duplicates returns duplicates without asking for them on each call"""
+    collector = Collector()
+    collector.insert(pd.DataFrame([{'query': 'a', 'username': 'user123'}, {'query': 'a', 'username': 'user123'}]))
+    collector.include_duplicates = True
+    assert len(collector.get_data().index) == 2
+    assert len(collector.get_data(include_duplicates=False).index) == 1
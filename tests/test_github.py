@@ -0,0 +1,60 @@
+import asyncio
+import subprocess
+import sys
+from typing import Any, Dict
+
+from sylva import Collector
+from sylva.modules.github import GitHub
+
+EXIT_WITHOUT_CLOSE = """
+from sylva import Collector
+from sylva.modules.github import GitHub
+
+async def noop() -> int:
+    return 1
+
+github = GitHub(collector=Collector(), api_key='')
+github._GitHub__run(noop())
+"""
+
+
+def test_exit_without_close() -> None:
+    """The interpreter exits promptly and cleanly even if a started module was never closed"""
+    result = subprocess.run([sys.executable, '-c', EXIT_WITHOUT_CLOSE], capture_output=True, timeout=60)
+    assert result.returncode == 0
+    assert b'Traceback' not in result.stderr
+
+
+class _Response:
+    def __init__(self, status: int, headers: Dict[str, str]) -> None:
+        self.status = status
+        self.headers = headers
+
+    async def __aenter__(self) -> '_Response':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def json(self) -> Dict:
+        return {'total_count': 0, 'items': []}
+
+
+class _Session:
+    def __init__(self, response: _Response) -> None:
+        self.response = response
+
+    def get(self, url: str, headers: Dict[str, str]) -> _Response:
+        return self.response
+
+
+def test_successful_page_updates_rate_limiter() -> None:
+    """The quota reported by a successful response is recorded before the page is returned"""
+    github = GitHub(collector=Collector(), api_key='')
+    try:
+        response = _Response(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '0'})
+        page = asyncio.run(github._GitHub__get_page(session=_Session(response), url='', headers={}))  # type: ignore[attr-defined]
+        assert page == {'total_count': 0, 'items': []}
+        assert github._GitHub__search_rate_limiter.remaining == 0  # type: ignore[attr-defined]
+    finally:
+        github.close()
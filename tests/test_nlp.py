@@ -5,7 +5,7 @@ from sylva.helpers.nlp import NatLangProcessor
 nlp = NatLangProcessor()
 
 
-@pytest.mark.parametrize('prompt,response', [
+SINGLE_RESIDENCY_PROMPTS = [
     ('I live in Boston', 'Boston'),
     ('I used to live in Boston, longer sentence', 'Boston'),
     ('I lived in Boston then', 'Boston'),
@@ -22,7 +22,10 @@ nlp = NatLangProcessor()
     ('I was living in Boston', 'Boston'),
     ('I hail from Boston', 'Boston'),
     ('I am hailing from Boston', 'Boston'),
-])
+]
+
+
+@pytest.mark.parametrize('prompt,response', SINGLE_RESIDENCY_PROMPTS)
 def test_single_residency(prompt: str, response: str) -> None:
     """Test a single residency query"""
     assert nlp.get_residences(prompt) == [response]
@@ -92,3 +95,32 @@ def test_invalid_prompt_type(prompt: str) -> None:
     with pytest.raises(TypeError):
         nlp.get_residences(prompt)
 
+
+@pytest.mark.parametrize('prompt', [
+    *[prompt for prompt, _ in SINGLE_RESIDENCY_PROMPTS],
+    'I live in New York, but I moved to Boston',
+    'I used to live in Boston, but I now live in Bremen',
+    "I've lived in Boston, vacationed in Enble, and moved to Bremen",
+    'Im moving to Boston',
+    'Ive lived in Boston',
+    'im based in Boston',
+])
+def test_prefilter_recall(prompt: str) -> None:
+    """Affirm that the prefilter never rejects a residency mention"""
+    assert nlp.might_mention_residence(prompt)
+
+
+@pytest.mark.parametrize('prompt', [
+    ('He lives in Boston'),
+    ('I vacationed in both Bostom and Bremen'),
+    ('Nothing to see here'),
+])
+def test_prefilter_rejects(prompt: str) -> None:
+    """Affirm that the prefilter rejects messages lacking a pronoun or residency word"""
+    assert not nlp.might_mention_residence(prompt)
+
+
+def test_batched_residencies() -> None:
+    """Affirm that batched results match individual results, in order"""
+    prompts = ['I live in New York', 'He lives in Boston', '', 'I grew up in Boston']
+    assert nlp.get_residences_many(prompts) == [nlp.get_residences(prompt) for prompt in prompts]
@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from sylva.errors import RequestError
+from sylva.helpers.rate_limit import RateLimiter
+
+
+def test_burst_then_interval() -> None:
+    """Requests within the burst are immediate, and later ones are spaced by the interval"""
+    limiter = RateLimiter(interval=10, burst=2, max_wait=60)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(10, abs=0.1)
+    assert limiter.reserve() == pytest.approx(20, abs=0.1)
+
+
+def test_exhausted_quota_parks_until_reset() -> None:
+    """An exhausted quota holds requests until the reset, given either as epoch time or a duration"""
+    limiter = RateLimiter(max_wait=60)
+    assert limiter.update(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(time.time() + 30)})
+    assert limiter.reserve() == pytest.approx(30, abs=1)
+
+    limiter = RateLimiter(max_wait=60)
+    assert not limiter.update(200, {'X-RateLimit-Remaining': '0.0', 'X-RateLimit-Reset': '12'})
+    assert limiter.reserve() == pytest.approx(12, abs=1)
+
+
+def test_retry_after_beyond_max_wait() -> None:
+    """Waits longer than max_wait are abandoned as rate limit errors"""
+    limiter = RateLimiter(max_wait=5)
+    assert limiter.update(429, {'Retry-After': '3600'})
+    with pytest.raises(RequestError) as e:
+        limiter.reserve()
+    assert e.value.rate_limit_exceeded
@@ -0,0 +1,47 @@
+import timeit
+
+import pytest
+
+from sylva.modules.reddit import MAX_WORD_LENGTH, normalize_text, normalize_texts
+
+
+@pytest.mark.parametrize('text,normalized', [
+    ('I live in [Boston](https://example.com)', 'I live in '),
+    ('I live in Boston (for now)', 'I live in Boston '),
+    ('She said "I live in Boston" once', 'She said  once'),
+    ('Tom &amp; I live in Boston', 'Tom & I live in Boston'),
+    ('Wait... what', 'Wait.  what'),
+    ('&gt; I live in Boston\nI live in Denver', 'I live in Denver'),
+])
+def test_substitution_chain(text: str, normalized: str) -> None:
+    """Every substitution in the chain is applied, not only the last"""
+    assert normalize_text(text) == normalized
+
+
+def test_urls_removed_whole() -> None:
+    """URLs are removed before ellipses are collapsed, so none of their parts survive"""
+    assert 'example' not in normalize_text('See https://www.example.com/page.html for more')
+
+
+def test_long_words_removed() -> None:
+    """Words longer than the maximum word length are dropped"""
+    assert normalize_text(f'I live in {"a" * (MAX_WORD_LENGTH + 1)} Boston') == 'I live in Boston'
+
+
+def test_bulk_normalization() -> None:
+    """Bulk normalization matches normalizing each message on its own"""
+    texts = ['I live in [Boston](https://example.com)', 'Tom &amp; I', '']
+    assert normalize_texts(texts) == [normalize_text(text) for text in texts]
+
+
+if __name__ == '__main__':
+    # Micro-benchmark: python tests/test_reddit.py
+    messages = [
+        '&gt; Quoted reply\nI moved to Boston last year... see [my post](https://reddit.com/r/boston) '
+        'and "this" (or that) &amp; https://example.com/page.html',
+        'Short comment',
+    ] * 500
+    runs = 20
+    seconds = timeit.timeit(lambda: normalize_texts(messages), number=runs)
+    print(f'{len(messages)} messages: {seconds / runs * 1000:.2f} ms per batch, '
+          f'{seconds / runs / len(messages) * 1e6:.2f} us per message')
@@ -0,0 +1,71 @@
+import pytest
+
+from sylva import Collector
+from sylva.errors import RequestError
+from sylva.helpers import proxy
+from sylva.modules import voter
+from sylva.modules.voter_regions.USA import VoterRecord, extract_voter_records
+from sylva.types import QueryType, SearchArgs
+
+
+def _row(id: int, slug: str, name: str, address: str|None, age: str|None) -> str:
+    address_html = f'<span itemprop="address">{address}</span>' if address is not None else ''
+    age_html = f'<strong>Age:&nbsp;</strong>{age}<br/>' if age is not None else ''
+    return (
+        f'<tr data-href="/voter/{id}/{slug}" itemscope itemtype="http://schema.org/Person">'
+        f'<td><span itemprop="name">{name} </span>{age_html}</td><td>{address_html}</td></tr>'
+    )
+
+
+def test_single_row() -> None:
+    """A single row is extracted with every field"""
+    page = f'<table>{_row(1, "john-doe", "John Doe", "1 Main St, Boston, MA", "42")}</table>'
+    assert extract_voter_records(page) == [
+        VoterRecord(
+            profile_url='https://voterrecords.com/voter/1/john-doe',
+            full_name='John Doe',
+            raw_address='1 Main St, Boston, MA',
+            age=42,
+        ),
+    ]
+
+
+def test_multiple_rows() -> None:
+    """Each row yields its own record, fields are not borrowed from neighbouring rows, and redacted rows are skipped"""
+    page = '<table>' + ''.join([
+        _row(1, 'john-doe', 'John Doe', '1 Main St, Boston, MA', None),
+        _row(2, 'john-doe', 'John Doe', None, '30'),
+        _row(3, 'john-a-doe', 'John A Doe', '2 Elm St, Denver, CO', '55'),
+    ]) + '</table>'
+    records = extract_voter_records(page)
+    assert [record.profile_url.rsplit('/voter/', 1)[1] for record in records] == ['1/john-doe', '3/john-a-doe']
+    assert records[0].age is None
+    assert records[1].age == 55
+
+
+def test_no_rows() -> None:
+    """Pages without results yield no records"""
+    assert extract_voter_records('<html><body>No results</body></html>') == []
+
+
+def test_session_pool_failure_is_request_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A browser session that cannot be created fails the lookup as a RequestError, which the handler reports"""
+    class FailedResponse:
+        status_code = 500
+        def json(self) -> dict:
+            return {}
+
+    monkeypatch.setattr(proxy.requests, 'post', lambda **kwargs: FailedResponse())
+    monkeypatch.setattr(proxy.ProxySvc, 'is_healthy', property(lambda self: True))
+    monkeypatch.setattr(voter, 'compare_to_known', lambda **kwargs: False)
+
+    proxy_svc = proxy.ProxySvc(session_pool_size=1)
+    proxy_svc.primary_proxy_url = 'http://127.0.0.1:1/v1'
+    runner = voter.Voter(collector=Collector(), proxy=proxy_svc)
+    search_args = SearchArgs(
+        query='John Doe',
+        query_type=QueryType.FULLNAME,
+        proxy_data={'proxy_url': proxy_svc.primary_proxy_url, 'flaresolverr_session_id': ''},
+    )
+    with pytest.raises(RequestError):
+        runner.search(search_args=search_args)